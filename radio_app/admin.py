@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.utils.html import format_html
 from .models import (
     Category, RadioStation, UserProfile, Event, 
-    BlogPost, ListeningHistory, Contact
+    BlogPost, ListeningHistory, Contact, StationDailyStats, CategoryDailyStats
 )
 
 
@@ -13,8 +13,9 @@ class CategoryAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
     def stations_count(self, obj):
-        return obj.stations.filter(is_active=True).count()
+        return obj.active_stations_count
     stations_count.short_description = 'Active Stations'
+    stations_count.admin_order_field = 'active_stations_count'
 
 
 @admin.register(RadioStation)
@@ -89,6 +90,32 @@ class ListeningHistoryAdmin(admin.ModelAdmin):
     readonly_fields = ['started_at']
 
 
+class DailyStatsAdmin(admin.ModelAdmin):
+    """Read-only view over the materialized analytics tables"""
+    date_hierarchy = 'date'
+    list_filter = ['date']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StationDailyStats)
+class StationDailyStatsAdmin(DailyStatsAdmin):
+    list_display = ['date', 'station', 'sessions', 'minutes', 'unique_listeners']
+    list_select_related = ['station']
+    search_fields = ['station__name']
+
+
+@admin.register(CategoryDailyStats)
+class CategoryDailyStatsAdmin(DailyStatsAdmin):
+    list_display = ['date', 'category', 'sessions', 'minutes', 'unique_listeners']
+    list_select_related = ['category']
+    search_fields = ['category__name']
+
+
 @admin.register(Contact)
 class ContactAdmin(admin.ModelAdmin):
     list_display = ['name', 'email', 'subject', 'is_resolved', 'created_at']
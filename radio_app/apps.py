@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class RadioAppConfig(AppConfig):
@@ -6,4 +7,6 @@ class RadioAppConfig(AppConfig):
     name = 'radio_app'
     
     def ready(self):
-        import radio_app.signals
\ No newline at end of file
+        import radio_app.signals
+        from radio_app.search import install_sqlite_search_indexes
+        post_migrate.connect(install_sqlite_search_indexes, sender=self)
@@ -0,0 +1,146 @@
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from .counters import listener_counter
+from .models import RadioStation
+
+SUGGESTION_FIELDS = ('id', 'name', 'country', 'language', 'listeners_count')
+
+
+def normalize(text):
+    """Lowercase and strip accents so "Bogotá" matches "bogo" """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).lower().strip()
+
+
+class StationAutocompleteIndex:
+    """In-memory prefix index over active station names, countries and languages.
+
+    Every term (the full name, each word of it, the country and the
+    language) is stored as a `(term, station_id)` pair in a sorted list, so
+    the stations matching a prefix are one bisection plus a scan of the
+    matching slice. Multi-word queries intersect the matches per word, and
+    results are ranked by live listener count.
+
+    Like the event index, it loads lazily, is patched by the RadioStation
+    signals and is rebuilt every `STATION_AUTOCOMPLETE_TTL` seconds to pick
+    up bulk updates. Listener counts are refreshed after every flush of this
+    process's counter (other workers' flushes arrive with the rebuild).
+    """
+
+    def __init__(self):
+        self._keys = []  # sorted (term, station_id)
+        self._stations = {}  # station_id -> suggestion dict
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'STATION_AUTOCOMPLETE_TTL', 300)
+
+    def rebuild(self):
+        rows = RadioStation.objects.filter(is_active=True).values(*SUGGESTION_FIELDS)
+        with self._lock:
+            self._stations = {row['id']: row for row in rows}
+            self._keys = sorted(
+                (term, station_id)
+                for station_id, row in self._stations.items()
+                for term in self._terms(row)
+            )
+            self._loaded_at = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._keys = []
+            self._stations = {}
+            self._loaded_at = None
+
+    def add(self, station):
+        """Insert or refresh a station (removing it if inactive); a no-op until loaded"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._discard(station.pk)
+            if not station.is_active:
+                return
+            row = {field: getattr(station, field) for field in SUGGESTION_FIELDS}
+            self._stations[station.pk] = row
+            for term in self._terms(row):
+                bisect.insort(self._keys, (term, station.pk))
+
+    def update_counts(self, counts):
+        """Store freshly flushed `{station_id: listeners_count}` values"""
+        with self._lock:
+            for station_id, listeners_count in counts.items():
+                row = self._stations.get(station_id)
+                if row is not None:
+                    row['listeners_count'] = listeners_count
+
+    def remove(self, station_id):
+        with self._lock:
+            self._discard(station_id)
+
+    def suggest(self, query, limit=10):
+        """Up to `limit` station dicts whose terms start with every word of `query`"""
+        words = normalize(query).split()
+        if not words:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            matches = None
+            for word in sorted(set(words), key=len, reverse=True):
+                station_ids = self._prefix_matches(word)
+                matches = station_ids if matches is None else matches & station_ids
+                if not matches:
+                    return []
+            rows = [self._stations[station_id] for station_id in matches]
+
+        ranked = heapq.nlargest(
+            limit, rows,
+            key=lambda row: (listener_counter.current(row['id'], row['listeners_count']), -row['id'])
+        )
+        return [
+            dict(row, listeners_count=listener_counter.current(row['id'], row['listeners_count']))
+            for row in ranked
+        ]
+
+    def _terms(self, row):
+        name = normalize(row['name'])
+        terms = {name, normalize(row['country']), normalize(row['language'])}
+        terms.update(name.split())
+        terms.discard('')
+        return terms
+
+    def _prefix_matches(self, prefix):
+        # Caller must hold self._lock
+        position = bisect.bisect_left(self._keys, (prefix,))
+        station_ids = set()
+        for term, station_id in self._keys[position:]:
+            if not term.startswith(prefix):
+                break
+            station_ids.add(station_id)
+        return station_ids
+
+    def _ensure_loaded(self):
+        # Caller must hold self._lock
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self.rebuild()
+
+    def _discard(self, station_id):
+        # Caller must hold self._lock
+        row = self._stations.pop(station_id, None)
+        if row is None:
+            return
+        for term in self._terms(row):
+            position = bisect.bisect_left(self._keys, (term, station_id))
+            if position < len(self._keys) and self._keys[position] == (term, station_id):
+                del self._keys[position]
+
+
+autocomplete_index = StationAutocompleteIndex()
+listener_counter.on_flush(autocomplete_index.update_counts)
@@ -0,0 +1,51 @@
+import logging
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run a callable every `interval` seconds on a daemon thread.
+
+    The thread is started lazily by `ensure_started()` so that importing a
+    module never spawns threads (management commands, migrations, tests).
+    """
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def ensure_started(self):
+        if self.is_running:
+            return
+        with self._lock:
+            if self.is_running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def run_once(self):
+        try:
+            self.func()
+        except Exception:
+            logger.exception("Periodic task %s failed", self.name)
+        finally:
+            close_old_connections()
@@ -0,0 +1,75 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from .background import PeriodicTask
+
+
+class ListenerBroadcaster:
+    """Coalesce listener count changes into one `listener_update` per tick.
+
+    Views call `publish()` for every change; only the latest count per station
+    is kept and, once per `LISTENER_BROADCAST_INTERVAL`, all changed counts
+    are sent to the `stations` group as a single message:
+
+        {'type': 'listener_update', 'counts': {'<station_id>': <count>, ...}}
+
+    Sockets subscribed to specific stations trim that message to their own
+    stations in the consumer, so every socket gets at most one frame per tick.
+    """
+
+    group_name = 'stations'
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._ticker = None
+
+    @property
+    def interval(self):
+        return getattr(settings, 'LISTENER_BROADCAST_INTERVAL', 0.5)
+
+    def publish(self, station_id, listeners_count):
+        with self._lock:
+            self._counts[str(station_id)] = listeners_count
+
+        if self.interval <= 0:
+            self.flush()
+        else:
+            self._ensure_ticker()
+
+    def flush(self):
+        """Send every count changed since the last tick"""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+
+        async_to_sync(self._send)(counts)
+        return len(counts)
+
+    async def _send(self, counts):
+        channel_layer = get_channel_layer()
+        await channel_layer.group_send(
+            self.group_name,
+            {
+                'type': 'listener_update',
+                'counts': counts,
+            }
+        )
+
+    def stop(self):
+        if self._ticker is not None:
+            self._ticker.stop()
+
+    def _ensure_ticker(self):
+        if self._ticker is None:
+            with self._lock:
+                if self._ticker is None:
+                    self._ticker = PeriodicTask('listener-broadcast', self.flush, self.interval)
+        self._ticker.ensure_started()
+
+
+listener_broadcaster = ListenerBroadcaster()
@@ -0,0 +1,97 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Sum
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .fragments import get_content_changed_at, get_content_version
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """Answer GETs with `304 Not Modified` before any serialization happens.
+
+    The ETag hashes the request path, the content version (bumped by the
+    model signals) and, when `conditional_timestamp_field` is set, one
+    `Max(field), Count(pk)` aggregate over the rows the action can return.
+    List views aggregate the filtered queryset, detail views the single
+    object and custom actions the whole queryset (a superset is always
+    safe). Columns written without touching the timestamp, like listener
+    counts, are covered by a `conditional_version_field` that every such
+    write increments; its sum joins the ETag. `Last-Modified` is sent
+    alongside only when the timestamp covers every change and the body is
+    the same for every user. Actions whose output doesn't come from the
+    database (e.g. in-memory indexes) are listed in
+    `conditional_exempt_actions`.
+    """
+    conditional_timestamp_field = None
+    conditional_version_field = None
+    conditional_exempt_actions = ()
+
+    def get_etag_extras(self):
+        """Extra per-view values the representation depends on"""
+        return []
+
+    def get_validator_queryset(self):
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        if self.action == 'list':
+            return self.filter_queryset(self.get_queryset())
+        return self.get_queryset()
+
+    def get_validators(self):
+        """(etag, last_modified) for the current request"""
+        parts = [self.request.get_full_path(), get_content_version()]
+        last_modified = None
+        if self.conditional_timestamp_field:
+            aggregates = {'last': Max(self.conditional_timestamp_field), 'count': Count('pk')}
+            if self.conditional_version_field:
+                aggregates['version'] = Sum(self.conditional_version_field)
+            try:
+                state = self.get_validator_queryset().order_by().aggregate(**aggregates)
+            except (ValueError, TypeError, ValidationError):
+                # A lookup value the field can't convert, e.g. /api/stations/abc/
+                raise Http404
+            parts += [state['last'], state['count'], state.get('version')]
+            extras = self.get_etag_extras()
+            if state['last'] is not None and not extras and not self.conditional_version_field:
+                last_modified = max(state['last'], get_content_changed_at() or state['last'])
+        else:
+            extras = self.get_etag_extras()
+        parts += extras
+        etag = '"%s"' % hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+        return etag, last_modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._etag = self._last_modified = None
+        if request.method not in ('GET', 'HEAD') or self.action in self.conditional_exempt_actions:
+            return
+        self._etag, self._last_modified = self.get_validators()
+        response = get_conditional_response(
+            request._request,
+            etag=self._etag,
+            last_modified=int(self._last_modified.timestamp()) if self._last_modified else None,
+        )
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, '_etag', None) and response.status_code in (200, 304):
+            response['ETag'] = self._etag
+            if self._last_modified:
+                response['Last-Modified'] = http_date(self._last_modified.timestamp())
+        return response
@@ -1,8 +1,9 @@
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.utils import timezone
-from .models import Event, RadioStation
+from .broadcast import ListenerBroadcaster
+from .encoding import dumps_text, loads
+from .live_events import live_events_snapshot
+from .presence import presence_tracker
 
 
 class EventConsumer(AsyncWebsocketConsumer):
@@ -19,7 +20,7 @@ class EventConsumer(AsyncWebsocketConsumer):
         
         # Send initial event data
         events = await self.get_live_events()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps_text({
             'type': 'initial_events',
             'events': events
         }))
@@ -37,50 +38,34 @@ class EventConsumer(AsyncWebsocketConsumer):
 
     # Receive message from room group
     async def event_update(self, event):
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            'type': 'event_update',
+        # Send the delta to WebSocket as event_created / event_updated / event_deleted
+        await self.send(text_data=dumps_text({
+            'type': f"event_{event['action']}",
             'event': event['event']
         }))
 
     async def events_refresh(self, event):
         # Send all live events
         events = await self.get_live_events()
-        await self.send(text_data=json.dumps({
+        await self.send(text_data=dumps_text({
             'type': 'events_refresh',
             'events': events
         }))
 
     @database_sync_to_async
     def get_live_events(self):
-        now = timezone.now()
-        live_events = Event.objects.filter(
-            start_time__lte=now,
-            end_time__gte=now
-        ).select_related('station')
-        
-        events_data = []
-        for event in live_events:
-            events_data.append({
-                'id': event.id,
-                'title': event.title,
-                'description': event.description,
-                'station_name': event.station.name,
-                'station_id': event.station.id,
-                'event_type': event.get_event_type_display(),
-                'start_time': event.start_time.strftime('%H:%M'),
-                'end_time': event.end_time.strftime('%H:%M'),
-                'host': event.host or 'N/A',
-                'is_live': True,
-                'is_featured': event.is_featured,
-            })
-        
-        return events_data
+        # Shared across all sockets; recomputed only after a change or boundary
+        return live_events_snapshot.get()
 
 
 class StationConsumer(AsyncWebsocketConsumer):
+    max_subscriptions = 100
+
     async def connect(self):
-        self.room_group_name = 'stations'
+        self.room_group_name = ListenerBroadcaster.group_name
+        # None until the client subscribes; then only these stations' counts are sent
+        self.subscriptions = None
+        self.listening_station_id = None
         
         # Join room group
         await self.channel_layer.group_add(
@@ -96,16 +81,82 @@ class StationConsumer(AsyncWebsocketConsumer):
             self.room_group_name,
             self.channel_name
         )
+        
+        # Stop counting this connection as a listener
+        await database_sync_to_async(presence_tracker.leave)(self.channel_name)
 
     async def receive(self, text_data):
-        # Handle incoming WebSocket messages if needed
-        pass
+        # Subscriptions: {"action": "subscribe", "station_ids": [1, 2]} and "unsubscribe".
+        # Presence messages: {"action": "listen", "station_id": 1},
+        # {"action": "heartbeat"} and {"action": "stop"}
+        try:
+            data = loads(text_data)
+        except ValueError:
+            return
+        if not isinstance(data, dict):
+            return
+        
+        action = data.get('action')
+        if action == 'listen':
+            try:
+                station_id = int(data.get('station_id'))
+            except (TypeError, ValueError):
+                return
+            if await database_sync_to_async(presence_tracker.join)(self.channel_name, station_id):
+                self.listening_station_id = station_id
+        elif action == 'stop':
+            self.listening_station_id = None
+            await database_sync_to_async(presence_tracker.leave)(self.channel_name)
+        elif action == 'heartbeat':
+            if not presence_tracker.touch(self.channel_name):
+                # Expired (or lost in a restart): count the listener again
+                await self.rejoin(data.get('station_id', self.listening_station_id))
+        elif action == 'subscribe':
+            await self.subscribe(self.parse_station_ids(data))
+        elif action == 'unsubscribe':
+            await self.unsubscribe(self.parse_station_ids(data))
+
+    async def rejoin(self, station_id):
+        try:
+            station_id = int(station_id)
+        except (TypeError, ValueError):
+            return
+        if await database_sync_to_async(presence_tracker.join)(self.channel_name, station_id):
+            self.listening_station_id = station_id
+
+    @staticmethod
+    def parse_station_ids(data):
+        station_ids = data.get('station_ids')
+        if not isinstance(station_ids, list):
+            return set()
+        parsed = set()
+        for station_id in station_ids:
+            try:
+                parsed.add(int(station_id))
+            except (TypeError, ValueError):
+                continue
+        return parsed
+
+    async def subscribe(self, station_ids):
+        """Receive listener updates only for the given stations"""
+        if self.subscriptions is None:
+            self.subscriptions = set()
+        room = self.max_subscriptions - len(self.subscriptions)
+        self.subscriptions.update(sorted(station_ids - self.subscriptions)[:max(room, 0)])
+
+    async def unsubscribe(self, station_ids):
+        if self.subscriptions is not None:
+            self.subscriptions -= station_ids
 
     # Receive message from room group
     async def listener_update(self, event):
-        # Send listener count update to WebSocket
-        await self.send(text_data=json.dumps({
+        # Send batched listener counts ({station_id: listeners_count}) to WebSocket
+        counts = event['counts']
+        if self.subscriptions is not None:
+            counts = {key: count for key, count in counts.items() if int(key) in self.subscriptions}
+            if not counts:
+                return
+        await self.send(text_data=dumps_text({
             'type': 'listener_update',
-            'station_id': event['station_id'],
-            'listeners_count': event['listeners_count']
+            'counts': counts
         }))
\ No newline at end of file
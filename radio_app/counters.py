@@ -0,0 +1,131 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from .background import PeriodicTask
+from .models import RadioStation
+
+
+class ListenerCounter:
+    """Absorb listener increments/decrements in memory and flush them in batches.
+
+    Pending deltas are kept in `shards` dictionaries, each guarded by its own
+    lock, so concurrent requests for different stations never contend. A flush
+    writes every pending delta back to `RadioStation.listeners_count` with a
+    single `UPDATE ... SET listeners_count = CASE ... END` statement, which is
+    atomic and only touches that column (and `listeners_version`). Because only deltas are written,
+    several worker processes can each run their own counter safely.
+    """
+
+    def __init__(self, shards=16):
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+        self._flush_callbacks = []
+
+    def on_flush(self, callback):
+        """Call `callback({station_id: listeners_count})` with the stored counts after each flush"""
+        self._flush_callbacks.append(callback)
+
+    def _shard(self, station_id):
+        return self._shards[station_id % len(self._shards)]
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'LISTENER_COUNTER_FLUSH_INTERVAL', 5)
+
+    def add(self, station_id, delta):
+        """Record a listener change; returns the station's not-yet-flushed delta"""
+        pending, lock = self._shard(station_id)
+        with lock:
+            pending[station_id] = pending.get(station_id, 0) + delta
+            unflushed = pending[station_id]
+
+        if self.flush_interval <= 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+        return unflushed
+
+    def increment(self, station_id):
+        return self.add(station_id, 1)
+
+    def decrement(self, station_id):
+        return self.add(station_id, -1)
+
+    def pending(self, station_id):
+        pending, lock = self._shard(station_id)
+        with lock:
+            return pending.get(station_id, 0)
+
+    def current(self, station_id, stored_count):
+        """Listener count as clients should see it: stored value plus pending delta"""
+        return max(stored_count + self.pending(station_id), 0)
+
+    def drain(self):
+        """Take all pending deltas, leaving the counter empty"""
+        deltas = {}
+        for pending, lock in self._shards:
+            with lock:
+                items = list(pending.items())
+                pending.clear()
+            for station_id, delta in items:
+                if delta:
+                    deltas[station_id] = delta
+        return deltas
+
+    def flush(self):
+        """Write pending deltas to the database in one batched UPDATE"""
+        deltas = self.drain()
+        if not deltas:
+            return 0
+
+        whens = [
+            When(pk=station_id, then=F('listeners_count') + Value(delta))
+            for station_id, delta in deltas.items()
+        ]
+        try:
+            with transaction.atomic():
+                RadioStation.objects.filter(pk__in=deltas.keys()).update(
+                    listeners_count=Greatest(
+                        Case(*whens, default=F('listeners_count'), output_field=IntegerField()),
+                        Value(0),
+                    ),
+                    listeners_version=F('listeners_version') + 1,
+                )
+        except Exception:
+            # Put the deltas back so they are retried on the next flush
+            for station_id, delta in deltas.items():
+                pending, lock = self._shard(station_id)
+                with lock:
+                    pending[station_id] = pending.get(station_id, 0) + delta
+            raise
+
+        if self._flush_callbacks:
+            self.notify_flushed(deltas.keys())
+        return len(deltas)
+
+    def notify_flushed(self, station_ids):
+        """Pass the stored counts of `station_ids` to the flush callbacks"""
+        counts = dict(RadioStation.objects.filter(pk__in=station_ids).values_list('id', 'listeners_count'))
+        for callback in self._flush_callbacks:
+            callback(counts)
+
+    def stop(self):
+        if self._flusher is not None:
+            self._flusher.stop()
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._flusher_lock:
+                if self._flusher is None:
+                    self._flusher = PeriodicTask('listener-counter-flush', self.flush, self.flush_interval)
+                    atexit.register(self.flush)
+        self._flusher.ensure_started()
+
+
+listener_counter = ListenerCounter()
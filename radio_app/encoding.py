@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import json
+
+from django.db.models import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library encoder
+    orjson = None
+
+# Matches DRF's output: "Z" for UTC, string keys for integer dict keys
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+def _default(obj):
+    """orjson fallback for the types DRF's JSONEncoder handles that orjson doesn't"""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, '__iter__') and not isinstance(obj, (str, dict)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(data):
+    """Encode to UTF-8 JSON bytes, formatted like DRF's JSONRenderer output"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def dumps_text(data):
+    """`dumps()` as a str, for WebSocket text frames"""
+    return dumps(data).decode()
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """JSONRenderer that encodes with orjson when it's installed.
+
+    Indented output (`Accept: application/json; indent=4` and the browsable
+    API) still goes through the standard library encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = dumps(data)
+        # Keep output a strict JavaScript subset, like JSONRenderer
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(parsers.JSONParser):
+    """JSONParser that decodes UTF-8 bodies with orjson when it's installed"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = parsers.get_encoding(parser_context or {})
+        if orjson is None or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,228 @@
+import bisect
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .background import PeriodicTask
+from .models import Event
+
+EVENT_INDEX_VERSION_KEY = 'radio_app:event_index:version'
+
+
+def _duration_bucket(duration):
+    """Bucket b holds events lasting under 2**b seconds (and at least half that)"""
+    return max(0, int(duration.total_seconds())).bit_length()
+
+
+class EventIntervalIndex:
+    """In-memory sorted-boundary index over `Event` start/end times.
+
+    Events are grouped into power-of-two duration buckets, each kept sorted
+    by `start_time`. An event in bucket b lasts under 2**b seconds, so those
+    overlapping [A, B] start within [A - 2**b s, B]: "live at T" and "live
+    between A and B" are two bisections per bucket plus a scan of a window no
+    wider than twice the bucket's durations. A single multi-day event only
+    widens the window of its own bucket. "Next N upcoming" uses a separate
+    list of every event sorted by start.
+
+    The index loads on first use and is patched by the Event signals once
+    their transaction commits. Each patch also bumps a shared cache version;
+    `start()` runs a background task that rebuilds from the database when
+    another process has bumped it, or every `EVENT_INDEX_TTL` seconds as a
+    safety net. Without the task (management commands, tests) an expired
+    index is rebuilt by the next lookup instead.
+    """
+
+    def __init__(self):
+        self._starts = []  # sorted (start_time, event_id)
+        self._buckets = {}  # duration bucket -> sorted (start_time, event_id)
+        self._intervals = {}  # event_id -> (start_time, end_time)
+        self._loaded_at = None
+        self._version = None
+        self._journal = None  # changes made while a rebuild reads the database
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._refresher = None
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'EVENT_INDEX_TTL', 300)
+
+    @property
+    def refresh_interval(self):
+        return getattr(settings, 'EVENT_INDEX_REFRESH_INTERVAL', 5)
+
+    def start(self):
+        """Load the index and keep it fresh from a background thread"""
+        if self.refresh_interval <= 0:
+            return
+        if self._refresher is None:
+            with self._lock:
+                if self._refresher is None:
+                    self._refresher = PeriodicTask('event-index-refresh', self.refresh, self.refresh_interval)
+        if not self._refresher.is_running:
+            threading.Thread(target=self._refresher.run_once, name='event-index-startup', daemon=True).start()
+        self._refresher.ensure_started()
+
+    def stop(self):
+        if self._refresher is not None:
+            self._refresher.stop()
+
+    def refresh(self):
+        """Rebuild when another process changed events or the TTL has passed"""
+        if (
+            self._loaded_at is None
+            or self._version != cache.get(EVENT_INDEX_VERSION_KEY, 0)
+            or time.monotonic() - self._loaded_at > self.ttl
+        ):
+            self.rebuild()
+
+    def rebuild(self):
+        with self._rebuild_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        # Caller must hold self._rebuild_lock
+        with self._lock:
+            self._journal = []
+        try:
+            version = cache.get(EVENT_INDEX_VERSION_KEY, 0)
+            rows = list(Event.objects.values_list('id', 'start_time', 'end_time'))
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+
+        intervals = {event_id: (start_time, end_time) for event_id, start_time, end_time in rows}
+        buckets = {}
+        for event_id, (start_time, end_time) in intervals.items():
+            buckets.setdefault(_duration_bucket(end_time - start_time), []).append((start_time, event_id))
+        for starts in buckets.values():
+            starts.sort()
+
+        with self._lock:
+            journal, self._journal = self._journal, None
+            self._intervals = intervals
+            self._buckets = buckets
+            self._starts = sorted((start, event_id) for event_id, (start, _) in intervals.items())
+            self._loaded_at = time.monotonic()
+            self._version = version
+            # Replay signal patches the query may have raced with
+            for event_id, interval in journal:
+                self._discard(event_id)
+                if interval is not None:
+                    self._insert(event_id, *interval)
+
+    def clear(self):
+        with self._lock:
+            self._starts = []
+            self._buckets = {}
+            self._intervals = {}
+            self._loaded_at = None
+            self._version = None
+
+    def add(self, event_id, start_time, end_time):
+        """Insert or move an event; only recorded for replay until the index has been loaded"""
+        with self._lock:
+            self._patch(event_id, (start_time, end_time))
+        self._publish_change()
+
+    def remove(self, event_id):
+        with self._lock:
+            self._patch(event_id, None)
+        self._publish_change()
+
+    def overlapping(self, start, end):
+        """(event_id, start_time, end_time) for events overlapping [start, end], by start time"""
+        self._ensure_loaded()
+        with self._lock:
+            result = []
+            for bucket, starts in self._buckets.items():
+                lo = bisect.bisect_left(starts, (start - timedelta(seconds=2 ** bucket),))
+                hi = bisect.bisect_right(starts, (end, float('inf')))
+                for start_time, event_id in starts[lo:hi]:
+                    end_time = self._intervals[event_id][1]
+                    if end_time >= start:
+                        result.append((event_id, start_time, end_time))
+            result.sort(key=lambda row: (row[1], row[0]))
+            return result
+
+    def live_ids(self, at=None):
+        at = at or timezone.now()
+        return [event_id for event_id, _, _ in self.overlapping(at, at)]
+
+    def upcoming(self, after=None, limit=10):
+        """(event_id, start_time, end_time) for the next `limit` events starting after `after`"""
+        after = after or timezone.now()
+        self._ensure_loaded()
+        with self._lock:
+            lo = bisect.bisect_right(self._starts, (after, float('inf')))
+            return [
+                (event_id, start_time, self._intervals[event_id][1])
+                for start_time, event_id in self._starts[lo:lo + limit]
+            ]
+
+    def upcoming_ids(self, after=None, limit=10):
+        return [event_id for event_id, _, _ in self.upcoming(after, limit)]
+
+    def _ensure_loaded(self):
+        if not self._needs_rebuild():
+            return
+        with self._rebuild_lock:
+            if self._needs_rebuild():
+                self._rebuild()
+
+    def _needs_rebuild(self):
+        if self._loaded_at is None:
+            return True
+        if self._refresher is not None and self._refresher.is_running:
+            return False  # the background task owns periodic rebuilds
+        return time.monotonic() - self._loaded_at > self.ttl
+
+    def _publish_change(self):
+        """Tell other processes' indexes to rebuild, without rebuilding this one"""
+        try:
+            version = cache.incr(EVENT_INDEX_VERSION_KEY)
+        except ValueError:
+            cache.add(EVENT_INDEX_VERSION_KEY, 1, timeout=None)
+            version = cache.get(EVENT_INDEX_VERSION_KEY, 1)
+        with self._lock:
+            if self._version == version - 1:
+                self._version = version
+
+    def _patch(self, event_id, interval):
+        # Caller must hold self._lock
+        if self._journal is not None:
+            self._journal.append((event_id, interval))
+        if self._loaded_at is None:
+            return
+        self._discard(event_id)
+        if interval is not None:
+            self._insert(event_id, *interval)
+
+    def _insert(self, event_id, start_time, end_time):
+        # Caller must hold self._lock
+        self._intervals[event_id] = (start_time, end_time)
+        bisect.insort(self._starts, (start_time, event_id))
+        bisect.insort(self._buckets.setdefault(_duration_bucket(end_time - start_time), []), (start_time, event_id))
+
+    def _discard(self, event_id):
+        # Caller must hold self._lock
+        interval = self._intervals.pop(event_id, None)
+        if interval is None:
+            return
+        entry = (interval[0], event_id)
+        bucket = _duration_bucket(interval[1] - interval[0])
+        for starts in (self._starts, self._buckets.get(bucket, [])):
+            position = bisect.bisect_left(starts, entry)
+            if position < len(starts) and starts[position] == entry:
+                del starts[position]
+        if not self._buckets.get(bucket, True):
+            del self._buckets[bucket]
+
+
+event_index = EventIntervalIndex()
@@ -0,0 +1,66 @@
+from django.db import transaction
+
+from .ingest import get_station_ids
+from .models import UserProfile
+
+# Join table behind UserProfile.favorite_stations
+FavoriteStation = UserProfile.favorite_stations.through
+
+
+def favorite_station_ids(user):
+    """Set of station IDs the user has favorited, loaded with one query"""
+    if not user.is_authenticated:
+        return set()
+    return set(FavoriteStation.objects.filter(userprofile__user=user).values_list('radiostation_id', flat=True))
+
+
+def toggle_favorite(profile, station_id):
+    """Flip one favorite and return the new state.
+
+    The DELETE doubles as the membership check: if it removed nothing, the
+    station wasn't a favorite and one row is inserted instead.
+    """
+    with transaction.atomic():
+        deleted, _ = FavoriteStation.objects.filter(userprofile=profile, radiostation_id=station_id).delete()
+        if deleted:
+            return False
+        FavoriteStation.objects.bulk_create(
+            [FavoriteStation(userprofile=profile, radiostation_id=station_id)], ignore_conflicts=True
+        )
+        return True
+
+
+def validate_station_ids(values):
+    """Split raw station IDs into (known IDs, rejected indexes)"""
+    station_ids = get_station_ids()
+    valid, rejected = [], []
+    for index, value in enumerate(values):
+        try:
+            station_id = int(value)
+        except (TypeError, ValueError):
+            rejected.append(index)
+            continue
+        if station_id not in station_ids:
+            rejected.append(index)
+            continue
+        valid.append(station_id)
+    return valid, rejected
+
+
+def update_favorites(profile, add=(), remove=(), replace=None):
+    """Apply many favorite changes with one DELETE and one INSERT.
+
+    `replace` makes the favorites exactly that set; otherwise `remove` is
+    applied before `add`.
+    """
+    favorites = FavoriteStation.objects.filter(userprofile=profile)
+    with transaction.atomic():
+        if replace is not None:
+            favorites.exclude(radiostation_id__in=replace).delete()
+            add = replace
+        elif remove:
+            favorites.filter(radiostation_id__in=remove).delete()
+        FavoriteStation.objects.bulk_create(
+            [FavoriteStation(userprofile=profile, radiostation_id=station_id) for station_id in set(add)],
+            ignore_conflicts=True
+        )
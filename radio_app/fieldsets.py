@@ -0,0 +1,106 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def _field_paths(model, source_attrs):
+    """ORM paths needed to read a dotted serializer source, or None if it isn't plain columns"""
+    paths, prefix = [], []
+    for attr in source_attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if not field.concrete or field.many_to_many:
+            return None
+        prefix.append(attr)
+        paths.append('__'.join(prefix))
+        if field.is_relation:
+            model = field.related_model
+    return paths
+
+
+def _select_related_paths(select_related, prefix=''):
+    if not isinstance(select_related, dict):
+        return []
+    paths = []
+    for name, nested in select_related.items():
+        paths.append(prefix + name)
+        paths.extend(_select_related_paths(nested, f'{prefix}{name}__'))
+    return paths
+
+
+def only_columns(serializer):
+    """Model field paths the serializer's fields read, or None if some field can't be resolved.
+
+    Fields that aren't plain (possibly dotted) columns, like method fields
+    and properties, are resolved through `Meta.source_columns`.
+    """
+    source_columns = getattr(serializer.Meta, 'source_columns', {})
+    columns = set()
+    for name, field in serializer.fields.items():
+        if name in source_columns:
+            paths = source_columns[name]
+        elif field.source == '*':
+            return None
+        else:
+            paths = _field_paths(serializer.Meta.model, field.source_attrs)
+        if paths is None:
+            return None
+        columns.update(paths)
+    return columns
+
+
+class SparseFieldsetMixin:
+    """`?fields=a,b` and `?exclude=c` on GET requests, plus compact list responses.
+
+    Non-detail actions (`list`, `popular`, `recent`, ...) use
+    `list_serializer_class` by default; asking for `?fields=` trims the full
+    serializer instead, so any field can still be requested. Querysets from
+    `get_queryset()` are narrowed with `.only()` to the columns the emitted
+    fields read.
+    """
+    list_serializer_class = None
+
+    def is_sparse_request(self):
+        return self.request is not None and self.request.method in SAFE_METHODS
+
+    def get_serializer_class(self):
+        if (self.list_serializer_class and self.is_sparse_request() and not self.detail
+                and not parse_field_names(self.request.query_params.get('fields'))):
+            return self.list_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer(self, *args, **kwargs):
+        if self.is_sparse_request():
+            fields = parse_field_names(self.request.query_params.get('fields'))
+            kwargs.setdefault('fields', fields or None)
+            kwargs.setdefault('exclude', parse_field_names(self.request.query_params.get('exclude')))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        return self.select_emitted_columns(super().get_queryset())
+
+    def select_emitted_columns(self, queryset):
+        """Narrow `queryset` to the columns the response will read (views overriding get_queryset call this)"""
+        if not self.is_sparse_request():
+            return queryset
+        columns = only_columns(self.get_serializer())
+        if columns is None:
+            return queryset
+        # Keep only the joins some field reads through; columns of relations
+        # that aren't joined are loaded lazily by the related object anyway
+        joined = _select_related_paths(queryset.query.select_related)
+        needed = [path for path in joined if any(column.startswith(path + '__') for column in columns)]
+        if len(needed) < len(joined):
+            queryset = queryset.select_related(None)
+            if needed:
+                queryset = queryset.select_related(*needed)
+        columns = {
+            path for path in columns
+            if '__' not in path or path.rsplit('__', 1)[0] in needed
+        }
+        return queryset.only(*columns, *needed)
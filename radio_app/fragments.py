@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .favorites import favorite_station_ids
+
+CONTENT_VERSION_KEY = 'radio_app:content_version'
+CONTENT_CHANGED_AT_KEY = 'radio_app:content_changed_at'
+
+
+def get_content_version():
+    """Version number folded into every cached template fragment key"""
+    version = cache.get(CONTENT_VERSION_KEY)
+    if version is None:
+        cache.add(CONTENT_VERSION_KEY, 1, timeout=None)
+        version = cache.get(CONTENT_VERSION_KEY, 1)
+    return version
+
+
+def get_content_changed_at():
+    """When the content version was last bumped (None if not since the cache was cleared)"""
+    return cache.get(CONTENT_CHANGED_AT_KEY)
+
+
+def bump_content_version():
+    """Orphan every cached fragment and API validator; called when stations, events or categories change"""
+    try:
+        cache.incr(CONTENT_VERSION_KEY)
+    except ValueError:
+        cache.add(CONTENT_VERSION_KEY, 2, timeout=None)
+    cache.set(CONTENT_CHANGED_AT_KEY, timezone.now(), timeout=None)
+
+
+def fragment_cache_context(request, *vary_on):
+    """Template context for `{% cache fragment_cache_ttl name fragment_key %}` blocks.
+
+    The key combines the content version, whether the user is logged in
+    (which changes the markup) and any extra request values, such as the
+    filters and page of a listing. Favorite stars are per user, so they
+    are left out of the fragments and applied in the browser from
+    `favorite_station_ids`.
+    """
+    user = request.user
+    return {
+        'fragment_cache_ttl': getattr(settings, 'FRAGMENT_CACHE_TTL', 60),
+        'fragment_key': ':'.join(
+            [str(get_content_version()), 'auth' if user.is_authenticated else 'anon']
+            + [str(value) for value in vary_on]
+        ),
+        'favorite_station_ids': sorted(favorite_station_ids(user)),
+    }
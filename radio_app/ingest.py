@@ -0,0 +1,189 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .background import PeriodicTask
+from .models import ListeningHistory, RadioStation
+from .rollups import apply_listening_sessions
+
+logger = logging.getLogger(__name__)
+
+STATION_IDS_CACHE_KEY = 'radio_app:station_ids'
+
+
+def get_station_ids():
+    """Cached set of every station ID, used to validate incoming sessions"""
+    station_ids = cache.get(STATION_IDS_CACHE_KEY)
+    if station_ids is None:
+        station_ids = frozenset(RadioStation.objects.values_list('id', flat=True))
+        cache.set(STATION_IDS_CACHE_KEY, station_ids, getattr(settings, 'STATION_IDS_CACHE_TTL', 60))
+    return station_ids
+
+
+def invalidate_station_ids():
+    cache.delete(STATION_IDS_CACHE_KEY)
+
+
+def validate_sessions(user, sessions):
+    """Split raw session dicts into (valid ListeningHistory rows, rejected indexes)"""
+    station_ids = get_station_ids()
+    rows, rejected = [], []
+    for index, session in enumerate(sessions):
+        try:
+            station_id = int(session['station_id'])
+            duration_minutes = int(session.get('duration_minutes', 0))
+        except (KeyError, TypeError, ValueError):
+            rejected.append(index)
+            continue
+        if station_id not in station_ids or duration_minutes < 0:
+            rejected.append(index)
+            continue
+        rows.append(ListeningHistory(user_id=user.pk, station_id=station_id, duration_minutes=duration_minutes))
+    return rows, rejected
+
+
+class ListeningSessionBuffer:
+    """Write-behind buffer for ListeningHistory rows.
+
+    Requests only append to an in-memory list; rows are written with one
+    `bulk_create` once `LISTENING_SESSION_BATCH_SIZE` are queued or every
+    `LISTENING_SESSION_FLUSH_INTERVAL` seconds, and drained at exit. Since
+    `bulk_create` skips the post_save signal, the flush also applies the
+    rows to the listening rollups.
+
+    A failed batch is re-queued for `LISTENING_SESSION_MAX_RETRIES` flushes;
+    after that it is split in halves until the rows that still fail are
+    isolated, and those are logged and dropped so they can't block later
+    flushes. `add()` refuses rows beyond `LISTENING_SESSION_MAX_BUFFER`.
+    """
+
+    def __init__(self):
+        self._rows = []
+        self._failures = 0  # consecutive failed flushes
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._flusher_lock = threading.Lock()
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'LISTENING_SESSION_BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'LISTENING_SESSION_FLUSH_INTERVAL', 2)
+
+    @property
+    def max_retries(self):
+        return getattr(settings, 'LISTENING_SESSION_MAX_RETRIES', 3)
+
+    @property
+    def max_buffer(self):
+        return getattr(settings, 'LISTENING_SESSION_MAX_BUFFER', 50000)
+
+    def add(self, rows):
+        """Queue rows for the next flush; returns False (queuing nothing) if the buffer is full"""
+        with self._lock:
+            if len(self._rows) + len(rows) > self.max_buffer:
+                logger.warning("Listening session buffer is full, refusing %d sessions", len(rows))
+                return False
+            self._rows.extend(rows)
+            queued = len(self._rows)
+
+        if self.flush_interval <= 0 or queued >= self.batch_size:
+            try:
+                self.flush()
+            except Exception:
+                # The rows stay queued for the next flush
+                logger.exception("Listening session flush failed")
+        else:
+            self._ensure_flusher()
+        return True
+
+    def pending(self):
+        with self._lock:
+            return len(self._rows)
+
+    def drain(self):
+        with self._lock:
+            rows, self._rows = self._rows, []
+        return rows
+
+    def flush(self):
+        """Write every buffered row; returns the number written"""
+        with self._flush_lock:
+            rows = self.drain()
+            if not rows:
+                return 0
+            try:
+                written = self._write_existing(rows)
+            except Exception:
+                self._failures += 1
+                if self._failures < self.max_retries:
+                    with self._lock:
+                        self._rows[:0] = rows
+                    raise
+                logger.exception("Listening session flush failed %d times, isolating bad rows", self._failures)
+                self._failures = 0
+                return self._write_isolating(rows)
+            self._failures = 0
+            return written
+
+    def stop(self):
+        if self._flusher is not None:
+            self._flusher.stop()
+
+    def _write(self, rows):
+        with transaction.atomic():
+            ListeningHistory.objects.bulk_create(rows, batch_size=self.batch_size)
+            apply_listening_sessions((row.user_id, row.station_id, row.duration_minutes) for row in rows)
+        return len(rows)
+
+    def _write_existing(self, rows):
+        try:
+            return self._write(rows)
+        except IntegrityError:
+            # A user or station was deleted while its sessions were queued
+            return self._write(self._existing(rows))
+
+    def _write_isolating(self, rows):
+        """Write `rows` in ever smaller halves, dropping single rows that still fail"""
+        try:
+            return self._write_existing(rows)
+        except Exception:
+            if len(rows) == 1:
+                row = rows[0]
+                logger.exception(
+                    "Dropping listening session (user %s, station %s) that failed to write",
+                    row.user_id, row.station_id
+                )
+                return 0
+        middle = len(rows) // 2
+        return self._write_isolating(rows[:middle]) + self._write_isolating(rows[middle:])
+
+    def _existing(self, rows):
+        user_ids = set(User.objects.filter(pk__in={row.user_id for row in rows}).values_list('pk', flat=True))
+        station_ids = set(RadioStation.objects.filter(pk__in={row.station_id for row in rows}).values_list('pk', flat=True))
+        dropped = [row for row in rows if row.user_id not in user_ids or row.station_id not in station_ids]
+        if dropped:
+            logger.warning("Dropping %d listening sessions for deleted users or stations", len(dropped))
+        return [
+            ListeningHistory(user_id=row.user_id, station_id=row.station_id, duration_minutes=row.duration_minutes)
+            for row in rows if row.user_id in user_ids and row.station_id in station_ids
+        ]
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            with self._flusher_lock:
+                if self._flusher is None:
+                    self._flusher = PeriodicTask('listening-session-flush', self.flush, self.flush_interval)
+                    atexit.register(self.flush)
+        self._flusher.ensure_started()
+
+
+listening_session_buffer = ListeningSessionBuffer()
@@ -0,0 +1,80 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.utils import timezone
+
+from .event_index import event_index
+from .models import Event
+
+
+def serialize_live_event(event, is_live=True):
+    """Payload used for live events sent over the events WebSocket"""
+    return {
+        'id': event.id,
+        'title': event.title,
+        'description': event.description,
+        'station_name': event.station.name,
+        'station_id': event.station.id,
+        'event_type': event.get_event_type_display(),
+        'start_time': event.start_time.strftime('%H:%M'),
+        'end_time': event.end_time.strftime('%H:%M'),
+        'host': event.host or 'N/A',
+        'is_live': is_live,
+        'is_featured': event.is_featured,
+    }
+
+
+def broadcast_event_change(action, event_data):
+    """Send a typed event delta (created/updated/deleted/started/ended) to the events group"""
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        'events',
+        {
+            'type': 'event_update',
+            'action': action,
+            'event': event_data
+        }
+    )
+
+
+class LiveEventsSnapshot:
+    """Process-wide cache of the serialized live-events list.
+
+    The list is computed once and shared by every `EventConsumer` for
+    `initial_events` and refresh fan-outs. It is invalidated by the Event
+    signals and expires on its own at the next start/end boundary, when the
+    set of live events changes purely because time has passed.
+    """
+
+    def __init__(self):
+        self._events = None
+        self._expires_at = None
+        self._lock = threading.Lock()
+
+    def get(self, now=None):
+        now = now or timezone.now()
+        with self._lock:
+            if self._events is None or (self._expires_at is not None and now >= self._expires_at):
+                self._events, self._expires_at = self._compute(now)
+            return self._events
+
+    def invalidate(self):
+        with self._lock:
+            self._events = None
+            self._expires_at = None
+
+    def _compute(self, now):
+        live_events = list(Event.objects.filter(
+            pk__in=event_index.live_ids(now),
+            start_time__lte=now,
+            end_time__gte=now
+        ).select_related('station'))
+
+        boundaries = [event.end_time for event in live_events]
+        boundaries.extend(start_time for _, start_time, _ in event_index.upcoming(now, limit=1))
+
+        return [serialize_live_event(event) for event in live_events], min(boundaries, default=None)
+
+
+live_events_snapshot = LiveEventsSnapshot()
@@ -0,0 +1,89 @@
+import json
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from radio_app.encoding import FastJSONRenderer, dumps_text, orjson
+from radio_app.live_events import serialize_live_event
+from radio_app.models import Category, Event, RadioStation
+from radio_app.serializers import RadioStationSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare JSON encoding throughput and latency for the station list and live-events payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stations', type=int, default=100, help='Stations in the list payload')
+        parser.add_argument('--events', type=int, default=50, help='Events in the live-events frame')
+        parser.add_argument('--iterations', type=int, default=1000, help='Encodings per measurement')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed: the fast path falls back to json'))
+
+        station_page, events_frame = self.build_payloads(options['stations'], options['events'])
+        json_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        benchmarks = [
+            ('station list', 'JSONRenderer', lambda: json_renderer.render(station_page)),
+            ('station list', 'FastJSONRenderer', lambda: fast_renderer.render(station_page)),
+            ('live events', 'json.dumps', lambda: json.dumps(events_frame)),
+            ('live events', 'dumps_text', lambda: dumps_text(events_frame)),
+        ]
+
+        self.stdout.write(f"{'payload':<14}{'encoder':<18}{'ops/s':>10}{'MB/s':>9}{'p50 us':>9}{'p99 us':>9}")
+        for payload, encoder, encode in benchmarks:
+            size, timings = self.measure(encode, options['iterations'])
+            total = sum(timings)
+            p99 = statistics.quantiles(timings, n=100)[98] if len(timings) > 1 else timings[0]
+            self.stdout.write(
+                f'{payload:<14}{encoder:<18}{len(timings) / total:>10.0f}{size * len(timings) / total / 1e6:>9.1f}'
+                f'{statistics.median(timings) * 1e6:>9.1f}{p99 * 1e6:>9.1f}'
+            )
+
+    def build_payloads(self, stations, events):
+        """Unsaved model instances run through the real serializers, so nothing touches the database"""
+        now = timezone.now()
+        category = Category(id=1, name='Music', active_stations_count=stations)
+        station_objects = [
+            RadioStation(
+                id=i, name=f'Station {i} – Lagos Jazz', description='Jazz, highlife and afrobeat. ' * 8,
+                stream_url=f'https://example.com/{i}', website_url='https://example.com',
+                category=category, country='Nigeria', language='English', bitrate=128,
+                listeners_count=i * 7, created_at=now, updated_at=now,
+            )
+            for i in range(1, stations + 1)
+        ]
+        station_page = {
+            'count': stations,
+            'next': None,
+            'previous': None,
+            'results': RadioStationSerializer(
+                station_objects, many=True, context={'favorite_station_ids': {1, 2, 3}}
+            ).data,
+        }
+        events_frame = {
+            'type': 'events_refresh',
+            'events': [
+                serialize_live_event(Event(
+                    id=i, title=f'Morning Show {i}', description='Live from the studio. ' * 4,
+                    station=station_objects[i % len(station_objects)], event_type='live_show',
+                    start_time=now, end_time=now + timedelta(hours=1), host='Ada',
+                ))
+                for i in range(1, events + 1)
+            ] if station_objects else [],
+        }
+        return station_page, events_frame
+
+    def measure(self, encode, iterations):
+        encoded = encode()
+        size = len(encoded.encode() if isinstance(encoded, str) else encoded)
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            encode()
+            timings.append(time.perf_counter() - started)
+        return size, timings
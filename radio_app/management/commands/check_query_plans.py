@@ -0,0 +1,126 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from radio_app.models import BlogPost, Category, Event, ListeningHistory, RadioStation
+
+SEQUENTIAL_SCAN_PATTERNS = {
+    # "Seq Scan on radio_app_event"
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    # "SCAN radio_app_event" (but not "SCAN radio_app_event USING INDEX ...")
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING)\b'),
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot view queries against a synthetic dataset and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Synthetic rows per table')
+
+    def handle(self, *args, **options):
+        pattern = SEQUENTIAL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'Query plan checks are not supported on {connection.vendor}')
+
+        failures = []
+        try:
+            # Everything runs in one transaction that is rolled back at the end
+            with transaction.atomic():
+                user = self.populate(options['rows'])
+                self.analyze()
+                for name, queryset in self.get_queries(user, options['rows']):
+                    plan = queryset.explain()
+                    scanned = pattern.findall(plan)
+                    status = 'SEQ SCAN ' + ', '.join(scanned) if scanned else 'ok'
+                    self.stdout.write(f'{name}: {status}')
+                    if scanned:
+                        failures.append(f'{name}:\n{plan}')
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError('Sequential scans found:\n\n' + '\n\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot queries use indexes'))
+
+    def populate(self, rows):
+        now = timezone.now()
+        user = User.objects.create_user(username='query-plan-check')
+        others = User.objects.bulk_create([User(username=f'query-plan-check-{i}') for i in range(20)])
+        category = Category.objects.create(name='Query plan check')
+
+        RadioStation.objects.bulk_create([
+            RadioStation(
+                name=f'Station {i}',
+                stream_url=f'https://example.com/{i}',
+                category=category,
+                country=f'Country {i % 50}',
+                language='English',
+                is_active=i % 10 != 0,
+                listeners_count=i % 997,
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        station = RadioStation.objects.first()
+
+        Event.objects.bulk_create([
+            Event(
+                title=f'Event {i}',
+                description='',
+                station=station,
+                start_time=now + timedelta(hours=i - rows // 2),
+                end_time=now + timedelta(hours=i - rows // 2, minutes=90),
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+
+        ListeningHistory.objects.bulk_create([
+            ListeningHistory(user=(user if i % 20 == 0 else others[i % 20]), station=station, duration_minutes=i % 120)
+            for i in range(rows)
+        ], batch_size=1000)
+
+        BlogPost.objects.bulk_create([
+            BlogPost(
+                title=f'Post {i}',
+                slug=f'query-plan-check-{i}',
+                content='',
+                author=user,
+                status='published' if i % 4 == 0 else 'draft',
+                is_featured=i % 50 == 0,
+                published_at=now - timedelta(hours=i) if i % 4 == 0 else None,
+            )
+            for i in range(rows)
+        ], batch_size=1000)
+        return user
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def get_queries(self, user, rows):
+        now = timezone.now()
+        stations = RadioStation.objects.filter(is_active=True)
+        published = BlogPost.objects.filter(status='published')
+        return [
+            ('stations list', stations.order_by('-listeners_count')[:20]),
+            ('popular stations', stations.order_by('-listeners_count')[:10]),
+            ('stations cursor page', stations.filter(
+                Q(listeners_count__lt=500) | Q(listeners_count=500, id__gt=rows // 2)
+            ).order_by('-listeners_count', 'id')[:20]),
+            ('live events', Event.objects.filter(start_time__lte=now, end_time__gte=now)),
+            ('upcoming events', Event.objects.filter(start_time__gt=now).order_by('start_time')[:20]),
+            ('listening history', ListeningHistory.objects.filter(user=user).order_by('-started_at')[:10]),
+            ('daily stats day', ListeningHistory.objects.filter(started_at__gte=now - timedelta(days=1), started_at__lt=now)),
+            ('recent posts', published.order_by('-published_at')[:10]),
+            ('featured posts', published.filter(is_featured=True)[:5]),
+        ]
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from radio_app.analytics import materialize_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Fold new ListeningHistory rows into the daily station and category analytics'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Ignore the watermark and recompute every day (picks up edited or deleted history)'
+        )
+
+    def handle(self, *args, **options):
+        days = materialize_daily_stats(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Materialized daily stats for {len(days)} days'))
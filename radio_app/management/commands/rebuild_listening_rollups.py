@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from radio_app.models import ListeningRollup
+from radio_app.rollups import rebuild_listening_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-user listening rollups from ListeningHistory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids', help='Only rebuild this user ID (repeatable)')
+
+    def handle(self, *args, **options):
+        rebuild_listening_rollups(options['user_ids'])
+        rebuilt = ListeningRollup.objects.count() if options['user_ids'] is None else len(options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt listening rollups for {rebuilt} users'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from radio_app.models import Category
+
+
+class Command(BaseCommand):
+    help = 'Recompute and repair Category.active_stations_count for every category'
+
+    def handle(self, *args, **options):
+        updated = Category.refresh_active_stations_count()
+        self.stdout.write(self.style.SUCCESS(f'Recounted active stations for {updated} categories'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', '-published_at'], name='blogpost_status_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(fields=['status', 'is_featured'], name='blogpost_status_featured_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blogpost',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-published_at'], name='blogpost_published_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'end_time'], name='event_time_range_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='listeninghistory',
+            index=models.Index(fields=['user', '-started_at'], name='history_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='radiostation',
+            index=models.Index(fields=['is_active', '-listeners_count'], name='station_active_listeners_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='radiostation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-listeners_count', 'name'], name='station_popular_active_idx'),
+        ),
+    ]
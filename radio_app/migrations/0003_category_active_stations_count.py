@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_active_stations_count(apps, schema_editor):
+    Category = apps.get_model('radio_app', 'Category')
+    RadioStation = apps.get_model('radio_app', 'RadioStation')
+    active_count = RadioStation.objects.filter(
+        category=OuterRef('pk'),
+        is_active=True
+    ).order_by().values('category').annotate(total=Count('pk')).values('total')
+    Category.objects.update(active_stations_count=Coalesce(Subquery(active_count), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0002_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='active_stations_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_active_stations_count, migrations.RunPython.noop),
+    ]
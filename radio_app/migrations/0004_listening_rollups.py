@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_listening_rollups(apps, schema_editor):
+    ListeningHistory = apps.get_model('radio_app', 'ListeningHistory')
+    ListeningRollup = apps.get_model('radio_app', 'ListeningRollup')
+    StationListeningRollup = apps.get_model('radio_app', 'StationListeningRollup')
+    history = ListeningHistory.objects.order_by()
+    ListeningRollup.objects.bulk_create([
+        ListeningRollup(user_id=row['user'], total_sessions=row['sessions'], total_minutes=row['minutes'] or 0)
+        for row in history.values('user').annotate(sessions=Count('id'), minutes=Sum('duration_minutes'))
+    ], batch_size=1000)
+    StationListeningRollup.objects.bulk_create([
+        StationListeningRollup(user_id=row['user'], station_id=row['station'], sessions=row['sessions'], minutes=row['minutes'] or 0)
+        for row in history.values('user', 'station').annotate(sessions=Count('id'), minutes=Sum('duration_minutes'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0003_category_active_stations_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListeningRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_sessions', models.IntegerField(default=0)),
+                ('total_minutes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='listening_rollup', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StationListeningRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sessions', models.IntegerField(default=0)),
+                ('minutes', models.IntegerField(default=0)),
+                ('station', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='listening_rollups', to='radio_app.radiostation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='station_listening_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-minutes'], name='rollup_user_minutes_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'station'), name='unique_station_rollup_per_user')],
+            },
+        ),
+        migrations.RunPython(populate_listening_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0004_listening_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategoryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sessions', models.IntegerField(default=0)),
+                ('minutes', models.IntegerField(default=0)),
+                ('unique_listeners', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Category daily stats',
+                'ordering': ['-date', '-minutes'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StationDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sessions', models.IntegerField(default=0)),
+                ('minutes', models.IntegerField(default=0)),
+                ('unique_listeners', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Station daily stats',
+                'ordering': ['-date', '-minutes'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='listeninghistory',
+            index=models.Index(fields=['started_at'], name='history_started_at_idx'),
+        ),
+        migrations.AddField(
+            model_name='categorydailystats',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='radio_app.category'),
+        ),
+        migrations.AddField(
+            model_name='stationdailystats',
+            name='station',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='radio_app.radiostation'),
+        ),
+        migrations.AddIndex(
+            model_name='categorydailystats',
+            index=models.Index(fields=['category', '-date'], name='category_daily_stats_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorydailystats',
+            constraint=models.UniqueConstraint(fields=('date', 'category'), name='unique_category_daily_stats'),
+        ),
+        migrations.AddIndex(
+            model_name='stationdailystats',
+            index=models.Index(fields=['station', '-date'], name='station_daily_stats_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='stationdailystats',
+            constraint=models.UniqueConstraint(fields=('date', 'station'), name='unique_station_daily_stats'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+def install_search_indexes(apps, schema_editor):
+    from radio_app.search import search_indexes
+
+    for index in search_indexes.values():
+        index.install(schema_editor)
+
+
+def uninstall_search_indexes(apps, schema_editor):
+    from radio_app.search import search_indexes
+
+    for index in search_indexes.values():
+        index.uninstall(schema_editor)
+
+
+class Migration(migrations.Migration):
+    """Full-text search: a generated tsvector column plus GIN index on
+    PostgreSQL, an FTS5 table kept in sync by triggers on SQLite."""
+
+    dependencies = [
+        ('radio_app', '0005_daily_analytics'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_indexes, uninstall_search_indexes),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:01
+
+from django.db import migrations, models
+
+
+def populate_tags(apps, schema_editor):
+    BlogPost = apps.get_model('radio_app', 'BlogPost')
+    Tag = apps.get_model('radio_app', 'Tag')
+    for post in BlogPost.objects.exclude(tags='').only('id', 'tags'):
+        names = []
+        for tag in post.tags.split(','):
+            name = ' '.join(tag.split()).lower()
+            if name and name not in names:
+                names.append(name)
+        tags = [Tag.objects.get_or_create(name=name)[0] for name in names]
+        post.tag_objects.set(tags)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0006_full_text_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='tag_objects',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='posts', to='radio_app.tag'),
+        ),
+        migrations.RunPython(populate_tags, migrations.RunPython.noop),
+    ]
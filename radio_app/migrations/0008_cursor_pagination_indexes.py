@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0007_blog_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_time', 'id'], name='event_start_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='radiostation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-listeners_count', 'id'], name='station_active_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0008_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='radiostation',
+            name='listeners_version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0009_radiostation_listeners_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticswatermark',
+            name='scanned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_tag_links(apps, schema_editor):
+    BlogPost = apps.get_model('radio_app', 'BlogPost')
+    BlogPostTag = apps.get_model('radio_app', 'BlogPostTag')
+    Tag = apps.get_model('radio_app', 'Tag')
+    for post in BlogPost.objects.exclude(tags='').only('id', 'tags'):
+        labels = {}
+        for tag in post.tags.split(','):
+            label = ' '.join(tag.split())
+            if label:
+                labels.setdefault(label.lower(), label)
+        BlogPostTag.objects.bulk_create([
+            BlogPostTag(post=post, tag=Tag.objects.get_or_create(name=name)[0], position=position, label=label)
+            for position, (name, label) in enumerate(labels.items())
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0010_analytics_watermark_scanned_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlogPostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('label', models.CharField(max_length=200)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_links', to='radio_app.blogpost')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='radio_app.tag')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('post', 'tag'), name='unique_tag_per_blog_post')],
+            },
+        ),
+        # An M2M can't gain a through model in place; swap it and rebuild from `tags`
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='tag_objects',
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='tag_objects',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='posts', through='radio_app.BlogPostTag', to='radio_app.tag'),
+        ),
+        migrations.RunPython(populate_tag_links, migrations.RunPython.noop),
+    ]
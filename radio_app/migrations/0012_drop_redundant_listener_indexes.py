@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('radio_app', '0011_blog_post_tag_order'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='radiostation',
+            name='station_active_listeners_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='radiostation',
+            name='station_popular_active_idx',
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.validators import URLValidator
@@ -8,6 +10,8 @@ class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, blank=True)  # For emoji or icon class
+    # Denormalized; kept in sync by RadioStation signals and RadioStationQuerySet
+    active_stations_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -17,6 +21,54 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def refresh_active_stations_count(cls, category_ids=None):
+        """Recompute stored active station counts (all categories if no IDs given) in one UPDATE"""
+        active_count = RadioStation.objects.filter(
+            category=OuterRef('pk'),
+            is_active=True
+        ).order_by().values('category').annotate(total=Count('pk')).values('total')
+
+        categories = cls.objects.all()
+        if category_ids is not None:
+            categories = categories.filter(pk__in=[pk for pk in category_ids if pk is not None])
+        return categories.update(active_stations_count=Coalesce(Subquery(active_count), 0))
+
+
+class RadioStationQuerySet(models.QuerySet):
+    """Keeps Category.active_stations_count and the template fragment version
+    correct for bulk operations, which bypass the model signals."""
+
+    COUNTED_FIELDS = {'is_active', 'category', 'category_id'}
+    # Listener count flushes change nothing the cached fragments depend on
+    LIVE_FIELDS = {'listeners_count', 'listeners_version', 'updated_at'}
+
+    def update(self, **kwargs):
+        if not set(kwargs) - self.LIVE_FIELDS:
+            return super().update(**kwargs)
+        from .fragments import bump_content_version
+
+        if not self.COUNTED_FIELDS.intersection(kwargs):
+            rows = super().update(**kwargs)
+            bump_content_version()
+            return rows
+        category_ids = set(self.order_by().values_list('category_id', flat=True).distinct())
+        rows = super().update(**kwargs)
+        new_category = kwargs.get('category_id', kwargs.get('category'))
+        if new_category is not None:
+            category_ids.add(getattr(new_category, 'pk', new_category))
+        Category.refresh_active_stations_count(category_ids)
+        bump_content_version()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from .fragments import bump_content_version
+
+        created = super().bulk_create(objs, *args, **kwargs)
+        Category.refresh_active_stations_count({station.category_id for station in created})
+        bump_content_version()
+        return created
+
 
 class RadioStation(models.Model):
     QUALITY_CHOICES = [
@@ -38,15 +90,36 @@ class RadioStation(models.Model):
     bitrate = models.IntegerField(default=128)  # in kbps
     is_active = models.BooleanField(default=True)
     listeners_count = models.IntegerField(default=0)
+    # Incremented by every listener count write, which leaves updated_at alone;
+    # the API's ETags use it to notice count changes
+    listeners_version = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RadioStationQuerySet.as_manager()
+
     class Meta:
         ordering = ['-listeners_count', 'name']
+        indexes = [
+            # The one index on listeners_count, which counter flushes rewrite
+            # constantly: serves the popular ordering and the keyset cursor
+            models.Index(
+                fields=['-listeners_count', 'id'],
+                name='station_active_cursor_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so signals can tell when category counts change
+        instance._loaded_counted_state = (instance.__dict__.get('category_id'), instance.__dict__.get('is_active'))
+        return instance
+
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -84,6 +157,10 @@ class Event(models.Model):
 
     class Meta:
         ordering = ['start_time']
+        indexes = [
+            models.Index(fields=['start_time', 'end_time'], name='event_time_range_idx'),
+            models.Index(fields=['start_time', 'id'], name='event_start_cursor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.station.name}"
@@ -98,6 +175,26 @@ class Event(models.Model):
         return self.start_time > timezone.now()
 
 
+def parse_tag_labels(value):
+    """Map each unique, lowercased tag name in a comma-separated string to its first display label, in order"""
+    labels = {}
+    for tag in (value or '').split(','):
+        label = ' '.join(tag.split())
+        if label:
+            labels.setdefault(label.lower(), label)
+    return labels
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=200, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 class BlogPost(models.Model):
     STATUS_CHOICES = [
         ('draft', 'Draft'),
@@ -113,6 +210,10 @@ class BlogPost(models.Model):
     featured_image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
+    # Normalized copy of `tags`; kept in sync by the BlogPost save signal
+    tag_objects = models.ManyToManyField(
+        Tag, through='BlogPostTag', related_name='posts', blank=True, editable=False
+    )
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -120,6 +221,15 @@ class BlogPost(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', '-published_at'], name='blogpost_status_recent_idx'),
+            models.Index(fields=['status', 'is_featured'], name='blogpost_status_featured_idx'),
+            models.Index(
+                fields=['-published_at'],
+                name='blogpost_published_recent_idx',
+                condition=models.Q(status='published'),
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -129,6 +239,56 @@ class BlogPost(models.Model):
             self.published_at = timezone.now()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored tags so the save signal only re-syncs on changes
+        instance._loaded_tags = instance.__dict__.get('tags')
+        return instance
+
+    @property
+    def tags_list(self):
+        """Tag labels as the author wrote them, read from the (ideally prefetched) `tag_links`"""
+        return [link.label for link in self.tag_links.all()]
+
+    def sync_tags(self):
+        """Point the tag relation at the tags in the `tags` string, creating new tags"""
+        labels = parse_tag_labels(self.tags)
+        Tag.objects.bulk_create([Tag(name=name) for name in labels], ignore_conflicts=True)
+        tag_ids = dict(Tag.objects.filter(name__in=labels).values_list('name', 'id'))
+        self.tag_links.all().delete()
+        BlogPostTag.objects.bulk_create([
+            BlogPostTag(post=self, tag_id=tag_ids[name], position=position, label=label)
+            for position, (name, label) in enumerate(labels.items())
+        ])
+        getattr(self, '_prefetched_objects_cache', {}).pop('tag_links', None)
+
+    def related_posts(self, limit=3):
+        """Published posts sharing the most tags with this one"""
+        return BlogPost.objects.filter(
+            status='published',
+            tag_objects__posts=self
+        ).exclude(pk=self.pk).annotate(
+            shared_tags=Count('tag_objects')
+        ).order_by('-shared_tags', '-published_at')[:limit]
+
+
+class BlogPostTag(models.Model):
+    """A post's tag, in the author's order and casing; `tag` is the shared, lowercased name"""
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='tag_links')
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='post_links')
+    position = models.PositiveSmallIntegerField()
+    label = models.CharField(max_length=200)
+
+    class Meta:
+        ordering = ['position']
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='unique_tag_per_blog_post'),
+        ]
+
+    def __str__(self):
+        return self.label
+
 
 class ListeningHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='listening_history')
@@ -138,10 +298,111 @@ class ListeningHistory(models.Model):
 
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', '-started_at'], name='history_user_recent_idx'),
+            models.Index(fields=['started_at'], name='history_started_at_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} listened to {self.station.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so signals can adjust the rollups on edits
+        instance._loaded_rollup_state = (
+            instance.__dict__.get('user_id'),
+            instance.__dict__.get('station_id'),
+            instance.__dict__.get('duration_minutes'),
+        )
+        return instance
+
+
+class ListeningRollup(models.Model):
+    """Per-user listening totals, maintained incrementally from ListeningHistory"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='listening_rollup')
+    total_sessions = models.IntegerField(default=0)
+    total_minutes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}: {self.total_sessions} sessions"
+
+
+class StationListeningRollup(models.Model):
+    """Per-user, per-station listening totals, maintained incrementally from ListeningHistory"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='station_listening_rollups')
+    station = models.ForeignKey(RadioStation, on_delete=models.CASCADE, related_name='listening_rollups')
+    sessions = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'station'], name='unique_station_rollup_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-minutes'], name='rollup_user_minutes_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} on {self.station.name}: {self.sessions} sessions"
+
+
+class StationDailyStats(models.Model):
+    """Listening totals per station per day, materialized by `materialize_daily_stats`"""
+    date = models.DateField()
+    station = models.ForeignKey(RadioStation, on_delete=models.CASCADE, related_name='daily_stats')
+    sessions = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+    unique_listeners = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', '-minutes']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'station'], name='unique_station_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['station', '-date'], name='station_daily_stats_idx'),
+        ]
+        verbose_name_plural = 'Station daily stats'
+
+    def __str__(self):
+        return f"{self.station.name} on {self.date}"
+
+
+class CategoryDailyStats(models.Model):
+    """Listening totals per category per day, materialized by `materialize_daily_stats`"""
+    date = models.DateField()
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_stats')
+    sessions = models.IntegerField(default=0)
+    minutes = models.IntegerField(default=0)
+    unique_listeners = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', '-minutes']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'category'], name='unique_category_daily_stats'),
+        ]
+        indexes = [
+            models.Index(fields=['category', '-date'], name='category_daily_stats_idx'),
+        ]
+        verbose_name_plural = 'Category daily stats'
+
+    def __str__(self):
+        return f"{self.category.name} on {self.date}"
+
+
+class AnalyticsWatermark(models.Model):
+    """Highest ListeningHistory ID already folded into an aggregation job"""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    # When the last run started; rows inserted shortly before it may have committed after it
+    scanned_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
 
 class Contact(models.Model):
     SUBJECT_CHOICES = [
@@ -0,0 +1,220 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from .background import PeriodicTask
+from .broadcast import listener_broadcaster
+from .counters import listener_counter
+from .models import RadioStation
+
+PRESENCE_WORKERS_KEY = 'radio_app:presence_workers'
+
+
+class PresenceTracker:
+    """Track which station each WebSocket connection is currently playing.
+
+    Every connection holds at most one presence entry. Entries are refreshed
+    by heartbeats and dropped after `LISTENER_PRESENCE_TTL` seconds of
+    silence, so a tab that dies without saying goodbye stops counting as a
+    listener on its own. Joins and leaves are fed to the listener counter as
+    +1/-1 deltas so counts move immediately.
+
+    Connections are WebSocket channel names, or `http:<id>` for clients of
+    the increment/decrement listener endpoints, which keep their presence
+    alive by calling increment again within the TTL.
+
+    Deltas alone drift: a restart drops the in-memory presence without any
+    -1s. So every `LISTENER_PRESENCE_RECONCILE_INTERVAL` seconds, and once
+    at startup, `reconcile()` sets `listeners_count` outright from the
+    presence counts that every worker publishes to the cache.
+    """
+
+    def __init__(self):
+        self._sessions = {}  # channel_name -> (station_id, last_seen)
+        self._stations = {}  # station_id -> set of channel names
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._reconciler = None
+        self.worker_id = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'LISTENER_PRESENCE_TTL', 90)
+
+    @property
+    def reconcile_interval(self):
+        return getattr(settings, 'LISTENER_PRESENCE_RECONCILE_INTERVAL', 60)
+
+    def listeners(self, station_id):
+        """Number of live presences for a station in this process"""
+        with self._lock:
+            return len(self._stations.get(station_id, ()))
+
+    def join(self, channel_name, station_id, now=None):
+        """Mark a connection as playing a station; returns False for unknown stations"""
+        if not RadioStation.objects.filter(pk=station_id, is_active=True).exists():
+            return False
+
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            previous = self._remove(channel_name)
+            self._sessions[channel_name] = (station_id, now)
+            self._stations.setdefault(station_id, set()).add(channel_name)
+
+        if previous != station_id:
+            if previous is not None:
+                record_listener_change(previous, -1)
+            record_listener_change(station_id, 1)
+        self._ensure_sweeper()
+        return True
+
+    def touch(self, channel_name, now=None):
+        """Refresh a connection's heartbeat; returns False if it has no presence (unknown or expired)"""
+        now = now if now is not None else time.monotonic()
+        with self._lock:
+            session = self._sessions.get(channel_name)
+            if session is None:
+                return False
+            self._sessions[channel_name] = (session[0], now)
+            return True
+
+    def station(self, channel_name):
+        """Station a connection is currently counted on, or None"""
+        with self._lock:
+            session = self._sessions.get(channel_name)
+            return session[0] if session is not None else None
+
+    def leave(self, channel_name):
+        with self._lock:
+            station_id = self._remove(channel_name)
+        if station_id is not None:
+            record_listener_change(station_id, -1)
+
+    def expire(self, now=None):
+        """Drop presences whose last heartbeat is older than the TTL"""
+        now = now if now is not None else time.monotonic()
+        cutoff = now - self.ttl
+        with self._lock:
+            stale = [name for name, (_, last_seen) in self._sessions.items() if last_seen < cutoff]
+            expired = [self._remove(name) for name in stale]
+
+        for station_id in expired:
+            record_listener_change(station_id, -1)
+        return len(expired)
+
+    def counts(self):
+        """{station_id: live presences} in this process"""
+        with self._lock:
+            return {station_id: len(channels) for station_id, channels in self._stations.items()}
+
+    def publish(self, counts):
+        """Share this worker's counts through the cache; returns the IDs of the live workers"""
+        lifetime = max(self.reconcile_interval, 1) * 3
+        cache.set(self._worker_key(self.worker_id), counts, lifetime)
+        now = time.time()
+        workers = {
+            worker_id: published_at
+            for worker_id, published_at in (cache.get(PRESENCE_WORKERS_KEY) or {}).items()
+            if published_at > now - lifetime
+        }
+        workers[self.worker_id] = now
+        cache.set(PRESENCE_WORKERS_KEY, workers, None)
+        return list(workers)
+
+    def reconcile(self):
+        """Set every station's `listeners_count` to its live presences across all workers.
+
+        Pending counter deltas are dropped, since the absolute counts
+        supersede them. Returns the number of stations whose count changed.
+        """
+        self.expire()
+        with self._lock:
+            local = {station_id: len(channels) for station_id, channels in self._stations.items()}
+            listener_counter.drain()
+        workers = self.publish(local)
+
+        totals = Counter(local)
+        others = [self._worker_key(worker_id) for worker_id in workers if worker_id != self.worker_id]
+        for snapshot in cache.get_many(others).values():
+            totals.update(snapshot)
+
+        stored = RadioStation.objects.filter(Q(listeners_count__gt=0) | Q(pk__in=list(totals))).values_list(
+            'id', 'listeners_count'
+        )
+        changed = {station_id: totals.get(station_id, 0) for station_id, count in stored if count != totals.get(station_id, 0)}
+        if changed:
+            RadioStation.objects.filter(pk__in=changed.keys()).update(
+                listeners_count=Case(
+                    *[When(pk=station_id, then=Value(count)) for station_id, count in changed.items()],
+                    default=F('listeners_count'), output_field=IntegerField(),
+                ),
+                listeners_version=F('listeners_version') + 1,
+            )
+            listener_counter.notify_flushed(changed.keys())
+            for station_id, count in changed.items():
+                listener_broadcaster.publish(station_id, count)
+        return len(changed)
+
+    def start(self):
+        """Reconcile now (on a background thread) and then periodically"""
+        if self._ensure_reconciler():
+            threading.Thread(target=self._reconciler.run_once, name='listener-presence-reconcile-startup', daemon=True).start()
+
+    def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.stop()
+        if self._reconciler is not None:
+            self._reconciler.stop()
+
+    @staticmethod
+    def _worker_key(worker_id):
+        return f'radio_app:presence:{worker_id}'
+
+    def _remove(self, channel_name):
+        # Caller must hold self._lock
+        session = self._sessions.pop(channel_name, None)
+        if session is None:
+            return None
+        station_id = session[0]
+        channels = self._stations.get(station_id)
+        if channels is not None:
+            channels.discard(channel_name)
+            if not channels:
+                del self._stations[station_id]
+        return station_id
+
+    def _ensure_sweeper(self):
+        if self._sweeper is None:
+            with self._lock:
+                if self._sweeper is None:
+                    self._sweeper = PeriodicTask('listener-presence-sweep', self.expire, max(self.ttl / 3, 1))
+        self._sweeper.ensure_started()
+        self._ensure_reconciler()
+
+    def _ensure_reconciler(self):
+        if self.reconcile_interval <= 0:
+            return False
+        if self._reconciler is None:
+            with self._lock:
+                if self._reconciler is None:
+                    self._reconciler = PeriodicTask('listener-presence-reconcile', self.reconcile, self.reconcile_interval)
+        self._reconciler.ensure_started()
+        return True
+
+
+def record_listener_change(station_id, delta):
+    """Apply a listener delta to the counter and broadcast the resulting count"""
+    stored = RadioStation.objects.filter(pk=station_id).values_list('listeners_count', flat=True).first()
+    if stored is None:
+        return
+    listener_broadcaster.publish(station_id, max(stored + listener_counter.add(station_id, delta), 0))
+
+
+presence_tracker = PresenceTracker()
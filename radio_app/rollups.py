@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import ListeningHistory, ListeningRollup, StationListeningRollup
+
+
+def apply_listening_sessions(sessions, sign=1):
+    """Add (or with sign=-1, subtract) sessions to the per-user rollups.
+
+    `sessions` is an iterable of (user_id, station_id, duration_minutes).
+    Subtractions never create rows, so cascading deletes of a user or station
+    don't resurrect rollups that were deleted alongside the history.
+    """
+    per_user = defaultdict(lambda: [0, 0])
+    per_station = defaultdict(lambda: [0, 0])
+    for user_id, station_id, minutes in sessions:
+        per_user[user_id][0] += sign
+        per_user[user_id][1] += sign * (minutes or 0)
+        per_station[(user_id, station_id)][0] += sign
+        per_station[(user_id, station_id)][1] += sign * (minutes or 0)
+
+    with transaction.atomic():
+        for user_id, (count, minutes) in per_user.items():
+            _increment(ListeningRollup, {'user_id': user_id}, sign > 0, total_sessions=count, total_minutes=minutes)
+        for (user_id, station_id), (count, minutes) in per_station.items():
+            _increment(StationListeningRollup, {'user_id': user_id, 'station_id': station_id}, sign > 0, sessions=count, minutes=minutes)
+
+
+def _increment(model, lookup, create, **increments):
+    updates = {field: F(field) + value for field, value in increments.items()}
+    if model.objects.filter(**lookup).update(**updates) or not create:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **increments)
+    except IntegrityError:
+        # Created concurrently by another request
+        model.objects.filter(**lookup).update(**updates)
+
+
+def get_listening_stats(user, limit=5):
+    """Listening totals and most listened stations, read from the rollups"""
+    rollup = ListeningRollup.objects.filter(user=user).values('total_sessions', 'total_minutes').first()
+    total_sessions = rollup['total_sessions'] if rollup else 0
+    total_minutes = rollup['total_minutes'] if rollup else 0
+
+    most_listened = StationListeningRollup.objects.filter(user=user, sessions__gt=0).order_by('-minutes').values(
+        'station__name',
+        count=F('sessions'),
+        total_minutes=F('minutes'),
+    )[:limit]
+
+    return {
+        'total_sessions': total_sessions,
+        'total_minutes': total_minutes,
+        'total_hours': round(total_minutes / 60, 1) if total_minutes else 0,
+        'most_listened_stations': most_listened,
+    }
+
+
+def rebuild_listening_rollups(user_ids=None):
+    """Recompute rollups from ListeningHistory (for all users if no IDs given)"""
+    history = ListeningHistory.objects.order_by()
+    if user_ids is not None:
+        history = history.filter(user_id__in=user_ids)
+
+    with transaction.atomic():
+        rollups = ListeningRollup.objects.all()
+        station_rollups = StationListeningRollup.objects.all()
+        if user_ids is not None:
+            rollups = rollups.filter(user_id__in=user_ids)
+            station_rollups = station_rollups.filter(user_id__in=user_ids)
+        rollups.delete()
+        station_rollups.delete()
+
+        ListeningRollup.objects.bulk_create([
+            ListeningRollup(user_id=row['user'], total_sessions=row['sessions'], total_minutes=row['minutes'] or 0)
+            for row in history.values('user').annotate(sessions=Count('id'), minutes=Sum('duration_minutes')).iterator()
+        ], batch_size=1000)
+        StationListeningRollup.objects.bulk_create([
+            StationListeningRollup(user_id=row['user'], station_id=row['station'], sessions=row['sessions'], minutes=row['minutes'] or 0)
+            for row in history.values('user', 'station').annotate(sessions=Count('id'), minutes=Sum('duration_minutes')).iterator()
+        ], batch_size=1000)
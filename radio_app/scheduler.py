@@ -0,0 +1,149 @@
+import heapq
+import logging
+import threading
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .event_index import event_index
+from .fragments import bump_content_version
+from .live_events import broadcast_event_change, live_events_snapshot, serialize_live_event
+from .models import Event
+from .stats import invalidate_platform_stats
+
+logger = logging.getLogger(__name__)
+
+START = 'start'
+END = 'end'
+
+
+class EventTransitionScheduler:
+    """Push `event_started` / `event_ended` broadcasts exactly when they happen.
+
+    A min-heap holds the upcoming `start_time` / `end_time` boundaries of
+    events within `horizon`. The worker thread sleeps until the earliest
+    boundary, broadcasts the transition and invalidates the live-events
+    snapshot. Event signals call `schedule()` / `unschedule()`; stale heap
+    entries are skipped lazily by checking them against `_times`.
+    """
+
+    def __init__(self, horizon=timedelta(hours=1)):
+        self.horizon = horizon
+        self._heap = []  # (when, event_id, kind)
+        self._times = {}  # event_id -> (start_time, end_time)
+        self._loaded_until = None
+        self._changed = False
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='event-transition-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def reload(self, now=None):
+        """Rebuild the heap from every event with a boundary inside the horizon"""
+        now = now or timezone.now()
+        until = now + self.horizon
+        events = event_index.overlapping(now, until)
+        with self._condition:
+            self._heap = []
+            self._times = {}
+            self._loaded_until = until
+            for event_id, start_time, end_time in events:
+                self._push(event_id, start_time, end_time, now)
+            self._changed = True
+            self._condition.notify()
+
+    def schedule(self, event_id, start_time, end_time, now=None):
+        now = now or timezone.now()
+        with self._condition:
+            if self._loaded_until is None:
+                return  # not running; the first reload() will pick the event up
+            self._times.pop(event_id, None)
+            self._push(event_id, start_time, end_time, now)
+            self._changed = True
+            self._condition.notify()
+
+    def unschedule(self, event_id):
+        with self._condition:
+            self._times.pop(event_id, None)
+
+    def due_transitions(self, now):
+        """Pop and return (event_id, kind) for every boundary at or before `now`"""
+        due = []
+        with self._condition:
+            while self._heap and self._heap[0][0] <= now:
+                when, event_id, kind = heapq.heappop(self._heap)
+                times = self._times.get(event_id)
+                if times is None or times[0 if kind == START else 1] != when:
+                    continue  # rescheduled or deleted since it was pushed
+                if kind == END:
+                    del self._times[event_id]
+                due.append((event_id, kind))
+        return due
+
+    def _push(self, event_id, start_time, end_time, now):
+        # Caller must hold self._condition
+        if end_time <= now or start_time > self._loaded_until:
+            return
+        self._times[event_id] = (start_time, end_time)
+        if start_time > now:
+            heapq.heappush(self._heap, (start_time, event_id, START))
+        heapq.heappush(self._heap, (end_time, event_id, END))
+
+    def _next_wakeup(self, now):
+        # Caller must hold self._condition
+        wakeups = [self._loaded_until] if self._loaded_until is not None else []
+        if self._heap:
+            wakeups.append(self._heap[0][0])
+        if not wakeups:
+            return 60  # nothing loaded yet (e.g. the database was unavailable)
+        return max((min(wakeups) - now).total_seconds(), 0)
+
+    def _run(self):
+        while True:
+            try:
+                now = timezone.now()
+                if self._loaded_until is None or now >= self._loaded_until:
+                    self.reload(now)
+                for event_id, kind in self.due_transitions(now):
+                    self._fire(event_id, kind)
+            except Exception:
+                logger.exception("Event transition scheduler failed")
+            finally:
+                close_old_connections()
+
+            with self._condition:
+                if self._stopped:
+                    return
+                if not self._changed:
+                    self._condition.wait(timeout=self._next_wakeup(timezone.now()))
+                self._changed = False
+                if self._stopped:
+                    return
+
+    def _fire(self, event_id, kind):
+        live_events_snapshot.invalidate()
+        invalidate_platform_stats()
+        bump_content_version()
+        event = Event.objects.select_related('station').filter(pk=event_id).first()
+        if event is None:
+            return
+        if kind == START:
+            broadcast_event_change('started', serialize_live_event(event, is_live=True))
+        else:
+            broadcast_event_change('ended', serialize_live_event(event, is_live=False))
+
+
+event_scheduler = EventTransitionScheduler()
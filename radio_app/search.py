@@ -0,0 +1,182 @@
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection, connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+from .models import BlogPost, RadioStation
+
+SEARCH_CONFIG = 'english'
+
+# Relative weight of each column: A ranks highest
+SEARCH_FIELDS = {
+    RadioStation: [('name', 'A'), ('description', 'B'), ('country', 'C'), ('language', 'C')],
+    BlogPost: [('title', 'A'), ('excerpt', 'B'), ('tags', 'B'), ('content', 'C')],
+}
+BM25_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 1.0}
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class FullTextIndex:
+    """Full-text index over a model's text columns.
+
+    On PostgreSQL a stored generated `search_vector` tsvector column with a
+    GIN index; on SQLite an external-content FTS5 table using the porter
+    stemmer, kept in sync by triggers. Both are created by migrations (and
+    repaired after `migrate` on SQLite, whose table rebuilds drop triggers);
+    neither is visible to the ORM. Search terms are prefix-matched and ANDed.
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.table = model._meta.db_table
+        self.fts_table = f'{self.table}_fts'
+        self.columns = [model._meta.get_field(name).column for name, _ in fields]
+
+    # Schema
+
+    def install(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            vector = ' || '.join(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+                for column, (_, weight) in zip(self.columns, self.fields)
+            )
+            schema_editor.execute(
+                f'ALTER TABLE {self.table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({vector}) STORED'
+            )
+            schema_editor.execute(f'CREATE INDEX {self.table}_search_idx ON {self.table} USING GIN (search_vector)')
+        elif vendor == 'sqlite':
+            self.install_sqlite(schema_editor.connection)
+
+    def uninstall(self, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            schema_editor.execute(f'ALTER TABLE {self.table} DROP COLUMN search_vector')
+        elif vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS {self.fts_table}_{suffix}')
+            schema_editor.execute(f'DROP TABLE IF EXISTS {self.fts_table}')
+
+    def install_sqlite(self, db):
+        """Create the FTS5 table and triggers if missing; rebuilds the index if anything was created"""
+        columns = ', '.join(self.columns)
+        new_values = ', '.join(f'new.{column}' for column in self.columns)
+        old_values = ', '.join(f'old.{column}' for column in self.columns)
+        statements = {
+            self.fts_table: (
+                f"CREATE VIRTUAL TABLE {self.fts_table} USING fts5({columns}, content='{self.table}', "
+                f"content_rowid='id', tokenize='porter unicode61')"
+            ),
+            f'{self.fts_table}_ai': (
+                f'CREATE TRIGGER {self.fts_table}_ai AFTER INSERT ON {self.table} BEGIN '
+                f'INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+            ),
+            f'{self.fts_table}_ad': (
+                f'CREATE TRIGGER {self.fts_table}_ad AFTER DELETE ON {self.table} BEGIN '
+                f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); END"
+            ),
+            # Only text edits touch the index, not e.g. listener count flushes
+            f'{self.fts_table}_au': (
+                f'CREATE TRIGGER {self.fts_table}_au AFTER UPDATE OF {columns} ON {self.table} BEGIN '
+                f"INSERT INTO {self.fts_table}({self.fts_table}, rowid, {columns}) VALUES ('delete', old.id, {old_values}); "
+                f'INSERT INTO {self.fts_table}(rowid, {columns}) VALUES (new.id, {new_values}); END'
+            ),
+        }
+        with db.cursor() as cursor:
+            cursor.execute(
+                f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(statements))})",
+                list(statements)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [sql for name, sql in statements.items() if name not in existing]
+            for sql in missing:
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('rebuild')")
+        return bool(missing)
+
+    # Queries
+
+    def search(self, queryset, text):
+        """Filter `queryset` to rows matching `text`, annotated with `search_rank` (higher is better)"""
+        words = WORD_PATTERN.findall(text)
+        if not words:
+            # Still annotated, since callers order by the rank
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        vendor = connection.vendor
+        if vendor == 'postgresql':
+            tsquery = ' & '.join(f"'{word}':*" for word in words)
+            matches = RawSQL(
+                f"SELECT id FROM {self.table} WHERE search_vector @@ to_tsquery('{SEARCH_CONFIG}', %s)",
+                [tsquery]
+            )
+            rank = RawSQL(
+                f"ts_rank({self.table}.search_vector, to_tsquery('{SEARCH_CONFIG}', %s))",
+                [tsquery], output_field=FloatField()
+            )
+        elif vendor == 'sqlite':
+            match = ' '.join(f'"{word}"*' for word in words)
+            weights = ', '.join(str(BM25_WEIGHTS[weight]) for _, weight in self.fields)
+            matches = RawSQL(f'SELECT rowid FROM {self.fts_table} WHERE {self.fts_table} MATCH %s', [match])
+            rank = RawSQL(
+                f'SELECT -bm25({self.fts_table}, {weights}) FROM {self.fts_table} '
+                f'WHERE {self.fts_table} MATCH %s AND rowid = {self.table}.id',
+                [match], output_field=FloatField()
+            )
+        else:
+            # No full-text support: fall back to substring matching
+            conditions = [
+                reduce(or_, (Q(**{f'{name}__icontains': word}) for name, _ in self.fields))
+                for word in words
+            ]
+            return queryset.filter(*conditions).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        return queryset.filter(pk__in=matches).annotate(search_rank=rank)
+
+
+search_indexes = {model: FullTextIndex(model, fields) for model, fields in SEARCH_FIELDS.items()}
+
+
+def full_text_search(queryset, text):
+    """Ranked full-text search over a RadioStation or BlogPost queryset"""
+    return search_indexes[queryset.model].search(queryset, text)
+
+
+def install_sqlite_search_indexes(using='default', **kwargs):
+    """post_migrate hook: SQLite drops triggers when Django rebuilds a table, so recreate them"""
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE name = 'django_migrations'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute("SELECT 1 FROM django_migrations WHERE app = 'radio_app' AND name = '0006_full_text_search'")
+        if cursor.fetchone() is None:
+            return
+    for index in search_indexes.values():
+        index.install_sqlite(db)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """`?search=` backed by the full-text index, ranked unless `?ordering=` is given.
+
+    List it after `OrderingFilter` so that relevance comes first and the
+    view's default ordering only breaks ties.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        queryset = full_text_search(queryset, text)
+        if request.query_params.get(filters.OrderingFilter.ordering_param):
+            return queryset
+        return queryset.order_by('-search_rank', *(queryset.query.order_by or queryset.model._meta.ordering))
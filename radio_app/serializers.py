@@ -2,22 +2,47 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import (
     Category, RadioStation, UserProfile, Event, 
-    BlogPost, ListeningHistory, Contact
+    BlogPost, ListeningHistory, Contact, StationDailyStats, CategoryDailyStats
 )
 
 
-class CategorySerializer(serializers.ModelSerializer):
-    stations_count = serializers.SerializerMethodField()
+class SparseFieldsMixin:
+    """Accept `fields` / `exclude` arguments that trim the emitted fields.
+
+    Compact list serializers name the serializer they trim in
+    `Meta.full_serializer`; any of its fields is a valid name, and excluding
+    one the compact variant already omits is a no-op.
+    """
+
+    def __init__(self, *args, fields=None, exclude=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = set(fields or ()) | set(exclude)
+        unknown = requested - set(self.fields) - self.full_field_names()
+        if unknown:
+            raise serializers.ValidationError({'fields': [f'Unknown field: {name}' for name in sorted(unknown)]})
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or name in exclude:
+                self.fields.pop(name)
+
+    @classmethod
+    def full_field_names(cls):
+        full_serializer = getattr(cls.Meta, 'full_serializer', None)
+        if full_serializer is None:
+            return frozenset()
+        if '_full_field_names' not in cls.__dict__:
+            cls._full_field_names = frozenset(full_serializer().fields)
+        return cls._full_field_names
+
+
+class CategorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    stations_count = serializers.IntegerField(source='active_stations_count', read_only=True)
 
     class Meta:
         model = Category
         fields = ['id', 'name', 'description', 'icon', 'stations_count', 'created_at']
 
-    def get_stations_count(self, obj):
-        return obj.stations.filter(is_active=True).count()
-
 
-class RadioStationSerializer(serializers.ModelSerializer):
+class RadioStationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     is_favorited = serializers.SerializerMethodField()
 
@@ -29,23 +54,39 @@ class RadioStationSerializer(serializers.ModelSerializer):
             'quality', 'bitrate', 'is_active', 'listeners_count', 
             'is_favorited', 'created_at', 'updated_at'
         ]
+        source_columns = {'is_favorited': []}
 
     def get_is_favorited(self, obj):
+        # Views pass the user's favorite IDs in the context to avoid a query per station
+        favorite_ids = self.context.get('favorite_station_ids')
+        if favorite_ids is not None:
+            return obj.id in favorite_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.favorited_by.filter(user=request.user).exists()
         return False
 
 
+class RadioStationListSerializer(RadioStationSerializer):
+    """Compact station for lists: no description, links or timestamps"""
+
+    class Meta(RadioStationSerializer.Meta):
+        full_serializer = RadioStationSerializer
+        fields = [
+            'id', 'name', 'stream_url', 'logo', 'category', 'category_name',
+            'country', 'language', 'quality', 'bitrate', 'listeners_count', 'is_favorited'
+        ]
+
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined']
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
-    favorite_stations = RadioStationSerializer(many=True, read_only=True)
+    favorite_stations = RadioStationListSerializer(many=True, read_only=True)
     favorite_stations_count = serializers.SerializerMethodField()
 
     class Meta:
@@ -59,7 +100,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return obj.favorite_stations.count()
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     station_name = serializers.CharField(source='station.name', read_only=True)
     is_live = serializers.ReadOnlyField()
     is_upcoming = serializers.ReadOnlyField()
@@ -71,9 +112,21 @@ class EventSerializer(serializers.ModelSerializer):
             'event_type', 'start_time', 'end_time', 'host', 'image', 
             'is_featured', 'is_live', 'is_upcoming', 'created_at'
         ]
+        source_columns = {'is_live': ['start_time', 'end_time'], 'is_upcoming': ['start_time']}
+
+
+class EventListSerializer(EventSerializer):
+    """Compact event for lists: no description"""
+
+    class Meta(EventSerializer.Meta):
+        full_serializer = EventSerializer
+        fields = [
+            'id', 'title', 'station', 'station_name', 'event_type', 'start_time',
+            'end_time', 'host', 'image', 'is_featured', 'is_live', 'is_upcoming'
+        ]
 
 
-class BlogPostSerializer(serializers.ModelSerializer):
+class BlogPostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author_name = serializers.CharField(source='author.get_full_name', read_only=True)
     author_username = serializers.CharField(source='author.username', read_only=True)
     tags_list = serializers.SerializerMethodField()
@@ -86,14 +139,24 @@ class BlogPostSerializer(serializers.ModelSerializer):
             'tags', 'tags_list', 'is_featured', 'created_at', 
             'updated_at', 'published_at'
         ]
+        source_columns = {'author_name': ['author', 'author__first_name', 'author__last_name'], 'tags_list': []}
 
     def get_tags_list(self, obj):
-        if obj.tags:
-            return [tag.strip() for tag in obj.tags.split(',')]
-        return []
+        return obj.tags_list
 
 
-class ListeningHistorySerializer(serializers.ModelSerializer):
+class BlogPostListSerializer(BlogPostSerializer):
+    """Compact post for lists: the excerpt instead of the content body"""
+
+    class Meta(BlogPostSerializer.Meta):
+        full_serializer = BlogPostSerializer
+        fields = [
+            'id', 'title', 'slug', 'excerpt', 'author_name', 'author_username',
+            'featured_image', 'tags_list', 'is_featured', 'published_at'
+        ]
+
+
+class ListeningHistorySerializer(SparseFieldsMixin, serializers.ModelSerializer):
     station_name = serializers.CharField(source='station.name', read_only=True)
     station_logo = serializers.ImageField(source='station.logo', read_only=True)
 
@@ -105,6 +168,22 @@ class ListeningHistorySerializer(serializers.ModelSerializer):
         ]
 
 
+class StationDailyStatsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    station_name = serializers.CharField(source='station.name', read_only=True)
+
+    class Meta:
+        model = StationDailyStats
+        fields = ['date', 'station', 'station_name', 'sessions', 'minutes', 'unique_listeners']
+
+
+class CategoryDailyStatsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
+    class Meta:
+        model = CategoryDailyStats
+        fields = ['date', 'category', 'category_name', 'sessions', 'minutes', 'unique_listeners']
+
+
 class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
@@ -1,29 +1,110 @@
+from functools import partial
+
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from .models import Event
+from .autocomplete import autocomplete_index
+from .event_index import event_index
+from .fragments import bump_content_version
+from .ingest import invalidate_station_ids
+from .live_events import broadcast_event_change, live_events_snapshot, serialize_live_event
+from .models import BlogPost, Category, Event, ListeningHistory, RadioStation
+from .rollups import apply_listening_sessions
+from .scheduler import event_scheduler
+from .stats import invalidate_platform_stats
 
 
 @receiver(post_save, sender=Event)
 def event_saved(sender, instance, created, **kwargs):
     """Send WebSocket update when an event is saved"""
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        'events',
-        {
-            'type': 'events_refresh'
-        }
-    )
+    # Re-read so field values are normalized (e.g. datetimes assigned as strings)
+    event = Event.objects.select_related('station').get(pk=instance.pk)
+    # Wait for the commit so other processes rebuild from, and a concurrent
+    # snapshot rebuild reads, the new rows; patch the index before the snapshot
+    transaction.on_commit(partial(event_index.add, event.id, event.start_time, event.end_time))
+    transaction.on_commit(live_events_snapshot.invalidate)
+    bump_content_version()
+    invalidate_platform_stats()
+    transaction.on_commit(partial(event_scheduler.schedule, event.id, event.start_time, event.end_time))
+    # Serialize now, send once committed so clients never see a rolled-back change
+    transaction.on_commit(partial(
+        broadcast_event_change,
+        'created' if created else 'updated',
+        serialize_live_event(event, is_live=event.is_live)
+    ))
 
 
 @receiver(post_delete, sender=Event)
 def event_deleted(sender, instance, **kwargs):
     """Send WebSocket update when an event is deleted"""
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        'events',
-        {
-            'type': 'events_refresh'
-        }
-    )
\ No newline at end of file
+    transaction.on_commit(partial(event_index.remove, instance.id))
+    transaction.on_commit(live_events_snapshot.invalidate)
+    bump_content_version()
+    invalidate_platform_stats()
+    transaction.on_commit(partial(event_scheduler.unschedule, instance.id))
+    transaction.on_commit(partial(broadcast_event_change, 'deleted', {'id': instance.id, 'is_live': False}))
+
+
+@receiver(post_save, sender=RadioStation)
+def station_saved(sender, instance, created, **kwargs):
+    """Refresh cached counts when a station is added or edited"""
+    invalidate_platform_stats()
+    bump_content_version()
+    autocomplete_index.add(instance)
+    if created:
+        invalidate_station_ids()
+    
+    # Only recount categories when the station's category or active flag changed
+    previous_category_id, previous_is_active = getattr(instance, '_loaded_counted_state', (None, None))
+    if created or (previous_category_id, previous_is_active) != (instance.category_id, instance.is_active):
+        Category.refresh_active_stations_count({previous_category_id, instance.category_id})
+    instance._loaded_counted_state = (instance.category_id, instance.is_active)
+
+
+@receiver(post_delete, sender=RadioStation)
+def station_deleted(sender, instance, **kwargs):
+    """Refresh cached counts when a station is removed"""
+    invalidate_platform_stats()
+    bump_content_version()
+    invalidate_station_ids()
+    autocomplete_index.remove(instance.id)
+    Category.refresh_active_stations_count({instance.category_id})
+
+
+@receiver(post_save, sender=ListeningHistory)
+def listening_history_saved(sender, instance, created, **kwargs):
+    """Keep the per-user listening rollups in step with recorded sessions"""
+    current = (instance.user_id, instance.station_id, instance.duration_minutes)
+    previous = getattr(instance, '_loaded_rollup_state', None)
+    if created:
+        apply_listening_sessions([current])
+    elif previous is not None and previous != current:
+        apply_listening_sessions([previous], sign=-1)
+        apply_listening_sessions([current])
+    instance._loaded_rollup_state = current
+
+
+@receiver(post_delete, sender=ListeningHistory)
+def listening_history_deleted(sender, instance, **kwargs):
+    """Remove a deleted session from the per-user listening rollups"""
+    state = getattr(instance, '_loaded_rollup_state', None) or (
+        instance.user_id, instance.station_id, instance.duration_minutes
+    )
+    apply_listening_sessions([state], sign=-1)
+
+
+@receiver(post_save, sender=BlogPost)
+def blog_post_saved(sender, instance, created, **kwargs):
+    """Mirror the comma-separated tags into the normalized tag relation"""
+    bump_content_version()  # the home page lists recent posts
+    if created or getattr(instance, '_loaded_tags', None) != instance.tags:
+        instance.sync_tags()
+    instance._loaded_tags = instance.tags
+
+
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def content_changed(sender, **kwargs):
+    """Orphan cached page fragments that show categories or posts"""
+    bump_content_version()
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+
+from .event_index import event_index
+from .models import RadioStation
+
+PLATFORM_STATS_CACHE_KEY = 'radio_app:platform_stats'
+
+
+def compute_platform_stats():
+    """Station totals in one aggregate query; the live count comes from the event index"""
+    stats = RadioStation.objects.filter(is_active=True).aggregate(
+        total_stations=Count('id'),
+        total_listeners=Coalesce(Sum('listeners_count'), 0),
+        countries_count=Count('country', distinct=True),
+    )
+    stats['live_events'] = len(event_index.live_ids())
+    return stats
+
+
+def get_platform_stats():
+    """Cached platform statistics shown on the home page and /api/stats/"""
+    stats = cache.get(PLATFORM_STATS_CACHE_KEY)
+    if stats is None:
+        stats = compute_platform_stats()
+        cache.set(PLATFORM_STATS_CACHE_KEY, stats, getattr(settings, 'PLATFORM_STATS_CACHE_TTL', 30))
+    return stats
+
+
+def invalidate_platform_stats():
+    cache.delete(PLATFORM_STATS_CACHE_KEY)
@@ -1,9 +1,43 @@
-from django.test import TestCase
+import asyncio
+import base64
+import json
+import uuid
+from decimal import Decimal
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.utils import timezone
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APITestCase
 from rest_framework import status
-from .models import Category, RadioStation, UserProfile, Event, BlogPost
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from .autocomplete import autocomplete_index
+from .broadcast import ListenerBroadcaster
+from .consumers import StationConsumer
+from .encoding import FastJSONRenderer
+from .counters import ListenerCounter, listener_counter
+from .event_index import EventIntervalIndex, _duration_bucket, event_index
+from .live_events import LiveEventsSnapshot, live_events_snapshot
+from .scheduler import EventTransitionScheduler, event_scheduler
+from .presence import PresenceTracker, presence_tracker
+from .models import Category, RadioStation, UserProfile, Event, BlogPost, ListeningHistory, ListeningRollup
+from .rollups import get_listening_stats
+from .analytics import materialize_daily_stats
+from .favorites import favorite_station_ids
+from .fragments import bump_content_version
+from .ingest import ListeningSessionBuffer, listening_session_buffer
+from .search import full_text_search, install_sqlite_search_indexes
+from .models import AnalyticsWatermark, StationDailyStats, CategoryDailyStats
 
 
 class RadioStationModelTest(TestCase):
@@ -75,6 +109,1242 @@ class RadioStationAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+@override_settings(LISTENER_COUNTER_FLUSH_INTERVAL=60)
+class ListenerCounterTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English",
+            listeners_count=5
+        )
+        self.counter = ListenerCounter(shards=4)
+
+    def tearDown(self):
+        self.counter.stop()
+
+    def test_changes_are_buffered_until_flush(self):
+        self.counter.increment(self.station.id)
+        self.counter.increment(self.station.id)
+        self.counter.decrement(self.station.id)
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 5)
+        self.assertEqual(self.counter.current(self.station.id, 5), 6)
+
+        with self.assertNumQueries(3):  # savepoint, update, release
+            self.assertEqual(self.counter.flush(), 1)
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 6)
+        self.assertEqual(self.counter.pending(self.station.id), 0)
+
+    def test_flush_never_goes_below_zero(self):
+        for _ in range(10):
+            self.counter.decrement(self.station.id)
+        self.counter.flush()
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 0)
+
+
+@override_settings(
+    LISTENER_COUNTER_FLUSH_INTERVAL=0, LISTENER_BROADCAST_INTERVAL=0, LISTENER_PRESENCE_RECONCILE_INTERVAL=0
+)
+class ListenerCountAPITest(APITestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.user = User.objects.create_user(username='listener', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        cache.clear()
+
+    def tearDown(self):
+        presence_tracker.expire(now=float('inf'))
+        presence_tracker.stop()
+
+    def test_increment_and_decrement_listeners(self):
+        url = reverse('radiostation-increment-listeners', kwargs={'pk': self.station.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.data['listeners_count'], 1)
+        # Repeating it is a heartbeat, not another listener
+        response = self.client.post(url)
+        self.assertEqual(response.data['listeners_count'], 1)
+
+        other = APIClient()
+        other.force_authenticate(user=self.user)
+        response = other.post(url)
+        self.assertEqual(response.data['listeners_count'], 2)
+
+        url = reverse('radiostation-decrement-listeners', kwargs={'pk': self.station.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.data['listeners_count'], 1)
+        response = self.client.post(url)
+        self.assertEqual(response.data['listeners_count'], 1)
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 1)
+
+    def test_http_listeners_survive_presence_reconcile(self):
+        url = reverse('radiostation-increment-listeners', kwargs={'pk': self.station.pk})
+        self.client.post(url)
+        self.assertEqual(presence_tracker.reconcile(), 0)
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 1)
+
+        self.client.post(reverse('radiostation-decrement-listeners', kwargs={'pk': self.station.pk}))
+        presence_tracker.reconcile()
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 0)
+
+    def test_decrement_stops_at_zero(self):
+        url = reverse('radiostation-decrement-listeners', kwargs={'pk': self.station.pk})
+        response = self.client.post(url)
+        self.assertEqual(response.data['listeners_count'], 0)
+
+    def test_unknown_station_returns_404(self):
+        url = reverse('radiostation-increment-listeners', kwargs={'pk': 9999})
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(LISTENER_BROADCAST_INTERVAL=60)
+class ListenerBroadcasterTest(TestCase):
+    def setUp(self):
+        self.broadcaster = ListenerBroadcaster()
+        self.channel_layer = get_channel_layer()
+        self.channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)('stations', self.channel_name)
+
+    def tearDown(self):
+        self.broadcaster.stop()
+        async_to_sync(self.channel_layer.group_discard)('stations', self.channel_name)
+
+    def test_changes_are_coalesced_into_one_message(self):
+        self.broadcaster.publish(1, 10)
+        self.broadcaster.publish(1, 11)
+        self.broadcaster.publish(2, 3)
+        self.assertEqual(self.broadcaster.flush(), 2)
+
+        message = async_to_sync(self.channel_layer.receive)(self.channel_name)
+        self.assertEqual(message['type'], 'listener_update')
+        self.assertEqual(message['counts'], {'1': 11, '2': 3})
+        self.assertEqual(self.broadcaster.flush(), 0)
+
+    def test_one_message_per_tick(self):
+        self.broadcaster.publish(1, 10)
+        self.broadcaster.publish(2, 3)
+        self.broadcaster.flush()
+
+        async_to_sync(self.channel_layer.receive)(self.channel_name)
+        with self.assertRaises(asyncio.TimeoutError):
+            async_to_sync(asyncio.wait_for)(self.channel_layer.receive(self.channel_name), 0.1)
+
+
+class StationConsumerTest(TestCase):
+    @override_settings(LISTENER_PRESENCE_RECONCILE_INTERVAL=0, LISTENER_COUNTER_FLUSH_INTERVAL=60)
+    async def test_heartbeat_rejoins_expired_presence(self):
+        category = await Category.objects.acreate(name="Music")
+        station = await RadioStation.objects.acreate(
+            name="Lagos Jazz", stream_url="https://example.com/stream", category=category,
+            country="Nigeria", language="English"
+        )
+        communicator = WebsocketCommunicator(StationConsumer.as_asgi(), '/ws/stations/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        try:
+            await communicator.send_json_to({'action': 'heartbeat', 'station_id': station.pk})
+            await communicator.receive_nothing()
+            self.assertEqual(presence_tracker.listeners(station.pk), 1)
+        finally:
+            await communicator.disconnect()
+            presence_tracker.stop()
+            listener_counter.drain()
+        self.assertEqual(presence_tracker.listeners(station.pk), 0)
+
+    async def test_subscribed_socket_only_gets_its_stations(self):
+        communicator = WebsocketCommunicator(StationConsumer.as_asgi(), '/ws/stations/')
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        await communicator.send_json_to({'action': 'subscribe', 'station_ids': [7, 'x']})
+        await communicator.receive_nothing()
+
+        channel_layer = get_channel_layer()
+        await channel_layer.group_send('stations', {'type': 'listener_update', 'counts': {'1': 1}})
+        await channel_layer.group_send('stations', {'type': 'listener_update', 'counts': {'1': 2, '7': 4, '8': 1}})
+        response = await communicator.receive_json_from()
+        self.assertEqual(response, {'type': 'listener_update', 'counts': {'7': 4}})
+        self.assertTrue(await communicator.receive_nothing())
+
+        # Unsubscribing from everything doesn't fall back to every station
+        await communicator.send_json_to({'action': 'unsubscribe', 'station_ids': [7]})
+        await communicator.receive_nothing()
+        await channel_layer.group_send('stations', {'type': 'listener_update', 'counts': {'7': 5}})
+        self.assertTrue(await communicator.receive_nothing())
+        await communicator.disconnect()
+
+
+@override_settings(
+    LISTENER_COUNTER_FLUSH_INTERVAL=0, LISTENER_BROADCAST_INTERVAL=0, LISTENER_PRESENCE_TTL=90,
+    LISTENER_PRESENCE_RECONCILE_INTERVAL=0,
+)
+class PresenceTrackerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.other_station = RadioStation.objects.create(
+            name="Other Station",
+            stream_url="https://example.com/other",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.tracker = PresenceTracker()
+
+    def tearDown(self):
+        self.tracker.stop()
+
+    def assertListeners(self, station, count):
+        station.refresh_from_db()
+        self.assertEqual(station.listeners_count, count)
+        self.assertEqual(self.tracker.listeners(station.id), count)
+
+    def test_join_switch_and_leave(self):
+        self.assertTrue(self.tracker.join('socket-1', self.station.id, now=0))
+        self.assertTrue(self.tracker.join('socket-2', self.station.id, now=0))
+        self.assertListeners(self.station, 2)
+
+        # Joining again from the same socket moves its presence
+        self.tracker.join('socket-1', self.other_station.id, now=1)
+        self.assertListeners(self.station, 1)
+        self.assertListeners(self.other_station, 1)
+
+        self.tracker.leave('socket-2')
+        self.tracker.leave('socket-2')
+        self.assertListeners(self.station, 0)
+
+    def test_unknown_station_is_ignored(self):
+        self.assertFalse(self.tracker.join('socket-1', 9999, now=0))
+
+    def test_presence_expires_without_heartbeat(self):
+        self.tracker.join('socket-1', self.station.id, now=0)
+        self.tracker.join('socket-2', self.station.id, now=0)
+        self.tracker.touch('socket-2', now=80)
+
+        self.assertEqual(self.tracker.expire(now=100), 1)
+        self.assertListeners(self.station, 1)
+
+    def test_heartbeat_after_expiry_reports_unknown(self):
+        self.tracker.join('socket-1', self.station.id, now=0)
+        self.assertTrue(self.tracker.touch('socket-1', now=10))
+        self.tracker.expire(now=200)
+        self.assertFalse(self.tracker.touch('socket-1', now=201))
+        self.assertFalse(self.tracker.touch('never-joined'))
+
+    def test_reconcile_sets_counts_from_presence(self):
+        # Counts left over from presence lost in a restart
+        RadioStation.objects.filter(pk=self.other_station.pk).update(listeners_count=7)
+        self.tracker.join('socket-1', self.station.id)
+        RadioStation.objects.filter(pk=self.station.pk).update(listeners_count=4)
+
+        # Another worker's published presence counts too
+        other = PresenceTracker()
+        other.join('socket-2', self.station.id)
+        other.publish(other.counts())
+
+        self.assertEqual(self.tracker.reconcile(), 2)
+        self.assertListeners(self.other_station, 0)
+        self.station.refresh_from_db()
+        self.assertEqual(self.station.listeners_count, 2)
+        self.assertEqual(self.tracker.reconcile(), 0)
+
+
+class PlatformStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        event_index.clear()
+        self.category = Category.objects.create(name="Test Category")
+        for name, country, listeners in [("A", "Nigeria", 10), ("B", "Nigeria", 5), ("C", "Ghana", 1)]:
+            RadioStation.objects.create(
+                name=name,
+                stream_url="https://example.com/stream",
+                category=self.category,
+                country=country,
+                language="English",
+                listeners_count=listeners
+            )
+        RadioStation.objects.create(
+            name="Inactive",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Kenya",
+            language="English",
+            listeners_count=100,
+            is_active=False
+        )
+
+    def test_stats_endpoint_is_cached(self):
+        url = reverse('stats-list')
+        response = self.client.get(url)
+        self.assertEqual(response.data, {
+            'total_stations': 3,
+            'total_listeners': 16,
+            'countries_count': 2,
+            'live_events': 0,
+        })
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def test_station_changes_invalidate_stats(self):
+        url = reverse('stats-list')
+        self.client.get(url)
+        RadioStation.objects.filter(name="Inactive").first().save()
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['total_stations'], 3)
+
+
+class StationListingViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Test Category")
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.client.force_login(self.user)
+
+    def create_stations(self, count):
+        RadioStation.objects.bulk_create([
+            RadioStation(
+                name=f"Station {i}",
+                stream_url="https://example.com/stream",
+                category=self.category,
+                country="Nigeria",
+                language="English",
+                listeners_count=i
+            )
+            for i in range(count)
+        ])
+
+    def count_queries(self, url):
+        bump_content_version()  # measure a full render, not cached fragments
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_catalog(self):
+        self.create_stations(5)
+        self.client.get(reverse('home'))  # warm the cached platform stats
+        small_catalog = (self.count_queries(reverse('stations')), self.count_queries(reverse('home')))
+        self.create_stations(100)
+        self.assertEqual((self.count_queries(reverse('stations')), self.count_queries(reverse('home'))), small_catalog)
+
+    def test_favorites_are_flagged(self):
+        self.create_stations(3)
+        favorite = RadioStation.objects.get(name="Station 1")
+        self.profile.favorite_stations.add(favorite)
+
+        # Station markup is shared between users; the stars come from a per-user ID list
+        for url in (reverse('stations'), reverse('home')):
+            response = self.client.get(url)
+            self.assertEqual(response.context['favorite_station_ids'], [favorite.id])
+            self.assertContains(response, f'<script id="favorite-station-ids" type="application/json">[{favorite.id}]</script>', html=True)
+
+
+class FavoritesQueryCountTest(APITestCase):
+    """Query counts must not depend on how many stations are serialized"""
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        stations = RadioStation.objects.bulk_create([
+            RadioStation(
+                name=f"Station {i}",
+                stream_url="https://example.com/stream",
+                category=self.category,
+                country="Nigeria",
+                language="English",
+                listeners_count=i
+            )
+            for i in range(15)
+        ])
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        profile = UserProfile.objects.create(user=self.user)
+        profile.favorite_stations.add(*stations[:10])
+        self.client.force_authenticate(user=self.user)
+
+    def test_station_endpoints(self):
+        # ETag validator + count + page, plus one query for the favorite IDs
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('radiostation-list'))
+        self.assertEqual(sum(station['is_favorited'] for station in response.data['results']), 10)
+
+        for name in ['radiostation-popular', 'radiostation-featured']:
+            with self.assertNumQueries(3):
+                self.client.get(reverse(name))
+
+    def test_toggle_favorite_checks_membership_in_the_database(self):
+        station = RadioStation.objects.get(listeners_count=0)
+        url = reverse('radiostation-toggle-favorite', kwargs={'pk': station.pk})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
+        self.assertFalse(response.data['is_favorited'])
+        self.assertFalse(any('SELECT "radio_app_userprofile_favorite_stations"' in query['sql'] for query in queries))
+
+        response = self.client.post(url)
+        self.assertTrue(response.data['is_favorited'])
+        self.assertEqual(len(favorite_station_ids(self.user)), 10)
+
+    def test_bulk_favorites(self):
+        url = reverse('userprofile-bulk-favorites')
+        stations = list(RadioStation.objects.order_by('listeners_count').values_list('id', flat=True))
+
+        response = self.client.post(url, {'add': stations[10:], 'remove': stations[:5] + ['x', 999999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['favorite_station_ids'], stations[5:])
+        self.assertEqual(response.data['rejected'], {'remove': [5, 6]})
+
+        response = self.client.post(url, {'replace': stations[:3]}, format='json')
+        self.assertEqual(response.data['favorite_station_ids'], stations[:3])
+        self.assertEqual(favorite_station_ids(self.user), set(stations[:3]))
+
+        response = self.client.post(url, {'replace': [], 'add': stations}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_favorites_query_count_is_constant(self):
+        url = reverse('userprofile-bulk-favorites')
+        stations = list(RadioStation.objects.values_list('id', flat=True))
+        self.client.post(url, {'replace': stations[:1]}, format='json')
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(url, {'replace': stations[1:3]}, format='json')
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(url, {'replace': stations[3:]}, format='json')
+        self.assertEqual(len(few), len(many))
+
+    def test_profile_endpoints(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('userprofile-favorites'))
+        self.assertEqual(len(response.data), 10)
+        self.assertTrue(all(station['is_favorited'] for station in response.data))
+
+        # profile + prefetched favorites + favorite IDs
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('userprofile-me'))
+        self.assertEqual(response.data['favorite_stations_count'], 10)
+
+
+class CategoryStationsCountTest(APITestCase):
+    def setUp(self):
+        self.news = Category.objects.create(name="News")
+        self.music = Category.objects.create(name="Music")
+        self.station = self.create_station("One", self.news)
+
+    def create_station(self, name, category, **kwargs):
+        return RadioStation.objects.create(
+            name=name,
+            stream_url="https://example.com/stream",
+            category=category,
+            country="Nigeria",
+            language="English",
+            **kwargs
+        )
+
+    def assertCounts(self, news, music):
+        self.news.refresh_from_db()
+        self.music.refresh_from_db()
+        self.assertEqual((self.news.active_stations_count, self.music.active_stations_count), (news, music))
+
+    def test_signals_keep_counts_in_sync(self):
+        self.create_station("Two", self.news)
+        self.create_station("Hidden", self.news, is_active=False)
+        self.assertCounts(2, 0)
+
+        self.station.category = self.music
+        self.station.save()
+        self.assertCounts(1, 1)
+
+        self.station.is_active = False
+        self.station.save()
+        self.assertCounts(1, 0)
+
+        RadioStation.objects.get(name="Two").delete()
+        self.assertCounts(0, 0)
+
+    def test_bulk_operations_keep_counts_in_sync(self):
+        RadioStation.objects.bulk_create([
+            RadioStation(name=f"Bulk {i}", stream_url="https://example.com/stream", category=self.music,
+                         country="Nigeria", language="English")
+            for i in range(3)
+        ])
+        self.assertCounts(1, 3)
+        RadioStation.objects.filter(category=self.music).update(is_active=False)
+        self.assertCounts(1, 0)
+        RadioStation.objects.filter(category=self.music).update(category=self.news, is_active=True)
+        self.assertCounts(4, 0)
+
+    def test_recount_command_repairs_counts(self):
+        Category.objects.update(active_stations_count=42)
+        call_command('recount_category_stations', stdout=StringIO())
+        self.assertCounts(1, 0)
+
+    def test_categories_endpoint_is_one_query(self):
+        with self.assertNumQueries(2):  # count + page
+            response = self.client.get(reverse('category-list'))
+        counts = {category['name']: category['stations_count'] for category in response.data['results']}
+        self.assertEqual(counts, {"News": 1, "Music": 0})
+
+
+class ListeningRollupTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="listener", password="pass")
+        category = Category.objects.create(name="News")
+        self.one, self.two = [
+            RadioStation.objects.create(
+                name=name, stream_url="https://example.com/stream", category=category,
+                country="Nigeria", language="English"
+            )
+            for name in ("One", "Two")
+        ]
+
+    def record(self, station, minutes):
+        return ListeningHistory.objects.create(user=self.user, station=station, duration_minutes=minutes)
+
+    def assertStats(self, sessions, minutes, top):
+        stats = get_listening_stats(self.user)
+        self.assertEqual((stats['total_sessions'], stats['total_minutes']), (sessions, minutes))
+        self.assertEqual(
+            [(row['station__name'], row['count'], row['total_minutes']) for row in stats['most_listened_stations']],
+            top
+        )
+
+    def test_signals_keep_rollups_in_sync(self):
+        self.record(self.one, 30)
+        session = self.record(self.two, 45)
+        self.record(self.one, 20)
+        self.assertStats(3, 95, [("One", 2, 50), ("Two", 1, 45)])
+
+        session = ListeningHistory.objects.get(pk=session.pk)
+        session.station = self.one
+        session.duration_minutes = 10
+        session.save()
+        self.assertStats(3, 60, [("One", 3, 60)])
+
+        session.delete()
+        self.assertStats(2, 50, [("One", 2, 50)])
+
+    def test_rebuild_command_repairs_rollups(self):
+        self.record(self.one, 30)
+        self.record(self.two, 45)
+        ListeningRollup.objects.update(total_sessions=99, total_minutes=99)
+        call_command('rebuild_listening_rollups', stdout=StringIO())
+        self.assertStats(2, 75, [("Two", 1, 45), ("One", 1, 30)])
+
+    def test_stats_query_count_is_independent_of_history_size(self):
+        for minutes in range(20):
+            self.record(self.two, minutes)
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('listeninghistory-list') + 'stats/')
+        self.assertEqual(response.data['total_sessions'], 20)
+        self.assertEqual(response.data['total_minutes'], 190)
+
+    def test_deleting_user_or_station_does_not_fail(self):
+        self.record(self.one, 30)
+        self.one.delete()
+        self.assertStats(0, 0, [])
+        self.record(self.two, 15)
+        self.user.delete()
+        self.assertFalse(ListeningRollup.objects.exists())
+
+
+class DailyStatsTest(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(username="alice", password="pass")
+        self.bob = User.objects.create_user(username="bob", password="pass")
+        self.news = Category.objects.create(name="News")
+        self.one, self.two = [
+            RadioStation.objects.create(
+                name=name, stream_url="https://example.com/stream", category=self.news,
+                country="Nigeria", language="English"
+            )
+            for name in ("One", "Two")
+        ]
+        self.today = timezone.now().replace(hour=12)
+        self.yesterday = self.today - timedelta(days=1)
+
+    def record(self, user, station, minutes, started_at):
+        session = ListeningHistory.objects.create(user=user, station=station, duration_minutes=minutes)
+        ListeningHistory.objects.filter(pk=session.pk).update(started_at=started_at)
+
+    def station_totals(self, day):
+        return {
+            stats.station.name: (stats.sessions, stats.minutes, stats.unique_listeners)
+            for stats in StationDailyStats.objects.filter(date=day.date())
+        }
+
+    def test_materializes_station_and_category_totals(self):
+        self.record(self.alice, self.one, 30, self.yesterday)
+        self.record(self.alice, self.one, 10, self.yesterday)
+        self.record(self.bob, self.two, 20, self.yesterday)
+        self.record(self.bob, self.one, 5, self.today)
+
+        days = materialize_daily_stats()
+
+        self.assertEqual(days, [self.yesterday.date(), self.today.date()])
+        self.assertEqual(self.station_totals(self.yesterday), {"One": (2, 40, 1), "Two": (1, 20, 1)})
+        self.assertEqual(self.station_totals(self.today), {"One": (1, 5, 1)})
+        category = CategoryDailyStats.objects.get(date=self.yesterday.date(), category=self.news)
+        self.assertEqual((category.sessions, category.minutes, category.unique_listeners), (3, 60, 2))
+
+    def test_only_days_with_new_rows_are_recomputed(self):
+        self.record(self.alice, self.one, 30, self.yesterday)
+        materialize_daily_stats()
+        self.assertEqual(materialize_daily_stats(), [])
+
+        self.record(self.bob, self.one, 15, self.today)
+        self.assertEqual(materialize_daily_stats(), [self.today.date()])
+        self.assertEqual(self.station_totals(self.yesterday), {"One": (1, 30, 1)})
+        self.assertEqual(self.station_totals(self.today), {"One": (1, 15, 1)})
+
+    def test_rows_committed_behind_the_watermark_are_picked_up(self):
+        now = timezone.now()
+        self.record(self.alice, self.one, 30, now)
+        materialize_daily_stats()
+
+        # A row whose transaction committed after the run, below a higher ID that didn't
+        self.record(self.bob, self.one, 15, now)
+        AnalyticsWatermark.objects.update(last_id=ListeningHistory.objects.aggregate(high=Max('id'))['high'])
+
+        self.assertEqual(materialize_daily_stats(), [now.date()])
+        self.assertEqual(self.station_totals(now), {"One": (2, 45, 2)})
+        self.assertEqual(materialize_daily_stats(), [])
+
+    def test_full_run_picks_up_deleted_history(self):
+        self.record(self.alice, self.one, 30, self.yesterday)
+        materialize_daily_stats()
+        ListeningHistory.objects.all().delete()
+        self.record(self.bob, self.two, 15, self.today)
+
+        call_command('materialize_daily_stats', '--full', stdout=StringIO())
+
+        self.assertEqual(self.station_totals(self.yesterday), {})
+        self.assertEqual(self.station_totals(self.today), {"Two": (1, 15, 1)})
+
+    def test_api_is_staff_only(self):
+        self.record(self.alice, self.one, 30, self.yesterday)
+        materialize_daily_stats()
+        url = reverse('stationdailystats-list')
+
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(User.objects.create_user(username="editor", is_staff=True))
+        response = self.client.get(url, {'date__gte': self.yesterday.date()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['station_name'], "One")
+        self.assertEqual(response.data['results'][0]['minutes'], 30)
+
+
+@override_settings(LISTENING_SESSION_FLUSH_INTERVAL=0)
+class ListeningSessionIngestTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="listener", password="pass")
+        category = Category.objects.create(name="News")
+        self.station = RadioStation.objects.create(
+            name="One", stream_url="https://example.com/stream", category=category,
+            country="Nigeria", language="English"
+        )
+        self.url = reverse('listeninghistory-list') + 'batch/'
+        self.client.force_authenticate(self.user)
+
+    def test_batch_is_written_with_constant_queries(self):
+        sessions = [{'station_id': self.station.id, 'duration_minutes': minutes} for minutes in range(50)]
+        self.client.post(self.url, {'sessions': sessions[:1]}, format='json')  # warm the station ID cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'sessions': sessions}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data, {'accepted': 50, 'rejected': []})
+        self.assertEqual(ListeningHistory.objects.count(), 51)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(get_listening_stats(self.user)['total_minutes'], sum(range(50)))
+
+    def test_invalid_sessions_are_rejected(self):
+        sessions = [
+            {'station_id': self.station.id, 'duration_minutes': 5},
+            {'station_id': 9999},
+            {'duration_minutes': 5},
+            {'station_id': self.station.id, 'duration_minutes': -1},
+        ]
+        response = self.client.post(self.url, {'sessions': sessions}, format='json')
+        self.assertEqual(response.data, {'accepted': 1, 'rejected': [1, 2, 3]})
+
+    def test_new_station_invalidates_cached_ids(self):
+        self.client.post(self.url, {'sessions': []}, format='json')
+        station = RadioStation.objects.create(
+            name="Two", stream_url="https://example.com/stream", category=self.station.category,
+            country="Nigeria", language="English"
+        )
+        response = self.client.post(self.url, {'sessions': [{'station_id': station.id}]}, format='json')
+        self.assertEqual(response.data['accepted'], 1)
+
+    @override_settings(LISTENING_SESSION_FLUSH_INTERVAL=60, LISTENING_SESSION_BATCH_SIZE=3)
+    def test_buffer_flushes_on_size(self):
+        buffer = ListeningSessionBuffer()
+        self.addCleanup(buffer.stop)
+        row = lambda: ListeningHistory(user=self.user, station=self.station, duration_minutes=1)
+
+        buffer.add([row(), row()])
+        self.assertEqual((buffer.pending(), ListeningHistory.objects.count()), (2, 0))
+
+        buffer.add([row()])
+        self.assertEqual((buffer.pending(), ListeningHistory.objects.count()), (0, 3))
+
+    @override_settings(LISTENING_SESSION_FLUSH_INTERVAL=60, LISTENING_SESSION_MAX_RETRIES=2)
+    def test_rows_that_keep_failing_are_isolated_and_dropped(self):
+        buffer = ListeningSessionBuffer()
+        self.addCleanup(buffer.stop)
+        row = lambda minutes=1: ListeningHistory(user=self.user, station=self.station, duration_minutes=minutes)
+        buffer.add([row(), row(), row(None), row()])
+
+        with self.assertRaises(IntegrityError):
+            buffer.flush()
+        self.assertEqual(buffer.pending(), 4)
+
+        with self.assertLogs('radio_app.ingest', 'ERROR'):
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual((buffer.pending(), ListeningHistory.objects.count()), (0, 3))
+
+    @override_settings(LISTENING_SESSION_FLUSH_INTERVAL=60, LISTENING_SESSION_MAX_BUFFER=2)
+    def test_full_buffer_refuses_sessions(self):
+        buffer = ListeningSessionBuffer()
+        self.addCleanup(buffer.stop)
+        self.addCleanup(buffer.drain)
+        row = lambda: ListeningHistory(user=self.user, station=self.station, duration_minutes=1)
+        self.assertTrue(buffer.add([row(), row()]))
+        with self.assertLogs('radio_app.ingest', 'WARNING'):
+            self.assertFalse(buffer.add([row()]))
+        self.assertEqual(buffer.pending(), 2)
+
+        with override_settings(LISTENING_SESSION_MAX_BUFFER=0), self.assertLogs('radio_app.ingest', 'WARNING'):
+            response = self.client.post(self.url, {'sessions': [{'station_id': self.station.id}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_single_session_endpoint_uses_buffer(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('record_session'), {'station_id': self.station.id, 'duration_minutes': 7}, format='json'
+        )
+        self.assertEqual(response.json(), {'status': 'success'})
+        self.assertEqual(listening_session_buffer.pending(), 0)
+        self.assertEqual(ListeningHistory.objects.get().duration_minutes, 7)
+
+
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Music")
+        self.jazz = self.create_station("Lagos Jazz", "Smooth jazz all night", listeners_count=5)
+        self.talk = self.create_station("Abuja Talk", "News and jazz commentary", listeners_count=50)
+        self.create_station("Rock FM", "Classic rock", listeners_count=100)
+        self.author = User.objects.create_user(username="author", password="pass")
+        BlogPost.objects.create(
+            title="Running a station", slug="running", content="Tips for broadcasters",
+            author=self.author, status="published"
+        )
+        BlogPost.objects.create(
+            title="Draft", slug="draft", content="Running notes", author=self.author, status="draft"
+        )
+
+    def create_station(self, name, description, **kwargs):
+        return RadioStation.objects.create(
+            name=name, description=description, stream_url="https://example.com/stream",
+            category=Category.objects.get(name="Music"), country="Nigeria", language="English", **kwargs
+        )
+
+    def names(self, queryset):
+        return [station.name for station in queryset]
+
+    def test_results_are_ranked_by_relevance(self):
+        results = full_text_search(RadioStation.objects.all(), "jazz").order_by('-search_rank')
+        # A title match outranks a description match despite fewer listeners
+        self.assertEqual(self.names(results), ["Lagos Jazz", "Abuja Talk"])
+
+    def test_stemming_and_prefix_matching(self):
+        self.assertEqual(self.names(full_text_search(RadioStation.objects.all(), "rocks")), ["Rock FM"])
+        self.assertEqual(self.names(full_text_search(RadioStation.objects.all(), "comment")), ["Abuja Talk"])
+        self.assertEqual(self.names(full_text_search(RadioStation.objects.all(), "!!")), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.jazz.name = "Lagos Highlife"
+        self.jazz.description = "Highlife classics"
+        self.jazz.save()
+        self.talk.delete()
+        self.assertEqual(self.names(full_text_search(RadioStation.objects.all(), "jazz")), [])
+        self.assertEqual(self.names(full_text_search(RadioStation.objects.all(), "highlife")), ["Lagos Highlife"])
+
+    def test_search_api_and_pages(self):
+        response = self.client.get(reverse('radiostation-list'), {'search': 'jazz'})
+        self.assertEqual([station['name'] for station in response.data['results']], ["Lagos Jazz", "Abuja Talk"])
+
+        response = self.client.get(reverse('radiostation-list'), {'search': 'jazz', 'ordering': '-listeners_count'})
+        self.assertEqual([station['name'] for station in response.data['results']], ["Abuja Talk", "Lagos Jazz"])
+
+        response = self.client.get(reverse('blogpost-list'), {'search': 'broadcaster'})
+        self.assertEqual([post['slug'] for post in response.data['results']], ["running"])
+
+        response = self.client.get(reverse('stations'), {'search': 'jazz'})
+        self.assertEqual(self.names(response.context['stations']), ["Lagos Jazz", "Abuja Talk"])
+
+    def test_punctuation_only_search_matches_nothing(self):
+        for url in (reverse('radiostation-list'), reverse('blogpost-list')):
+            response = self.client.get(url, {'search': '***'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['results'], [])
+
+        response = self.client.get(reverse('stations'), {'search': '***'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.names(response.context['stations']), [])
+        response = self.client.get(reverse('blog'), {'search': '---'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.context['posts']), [])
+
+    def test_missing_triggers_are_reinstalled_after_migrate(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER radio_app_radiostation_fts_ai")
+        install_sqlite_search_indexes(using='default')
+        self.create_station("Kano Jazz", "")
+        self.assertIn("Kano Jazz", self.names(full_text_search(RadioStation.objects.all(), "jazz")))
+
+
+class StationAutocompleteTest(APITestCase):
+    def setUp(self):
+        autocomplete_index.clear()
+        self.category = Category.objects.create(name="Music")
+        self.lagos = self.create_station("Lagos Jazz", "Nigeria", "English", listeners_count=5)
+        self.create_station("Lagos Talk", "Nigeria", "Yoruba", listeners_count=50)
+        self.create_station("Bogotá Estéreo", "Colombia", "Spanish", listeners_count=20)
+        self.create_station("Lagoon Hidden", "Nigeria", "English", is_active=False)
+
+    def create_station(self, name, country, language, **kwargs):
+        return RadioStation.objects.create(
+            name=name, stream_url="https://example.com/stream", category=self.category,
+            country=country, language=language, **kwargs
+        )
+
+    def names(self, query):
+        return [row['name'] for row in autocomplete_index.suggest(query)]
+
+    def test_prefix_matches_ranked_by_listeners(self):
+        self.assertEqual(self.names("lag"), ["Lagos Talk", "Lagos Jazz"])
+        self.assertEqual(self.names("jaz"), ["Lagos Jazz"])
+        self.assertEqual(self.names("nig"), ["Lagos Talk", "Lagos Jazz"])
+        self.assertEqual(self.names("lagos yor"), ["Lagos Talk"])
+        self.assertEqual(self.names("bogota"), ["Bogotá Estéreo"])
+        self.assertEqual(self.names("xyz"), [])
+
+    def test_signals_patch_loaded_index(self):
+        self.names("lag")  # load
+        self.lagos.name = "Abuja Jazz"
+        self.lagos.save()
+        self.create_station("Lagos Beat", "Nigeria", "English", listeners_count=99)
+        RadioStation.objects.get(name="Lagos Talk").delete()
+        self.assertEqual(self.names("lag"), ["Lagos Beat"])
+        self.assertEqual(self.names("abu"), ["Abuja Jazz"])
+
+    def test_endpoint_does_not_query_once_loaded(self):
+        url = reverse('radiostation-list') + 'autocomplete/'
+        self.client.get(url, {'q': 'l'})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'la', 'limit': 1})
+        self.assertEqual([row['name'] for row in response.data], ["Lagos Talk"])
+        self.assertEqual(response.data[0]['listeners_count'], 50)
+
+    @override_settings(LISTENER_COUNTER_FLUSH_INTERVAL=60)
+    def test_counter_flushes_refresh_loaded_counts(self):
+        self.names("lag")  # load
+        for _ in range(100):
+            listener_counter.increment(self.lagos.pk)
+        listener_counter.flush()
+        self.assertEqual(listener_counter.pending(self.lagos.pk), 0)
+        suggestions = autocomplete_index.suggest("lag")
+        self.assertEqual([row['name'] for row in suggestions], ["Lagos Jazz", "Lagos Talk"])
+        self.assertEqual(suggestions[0]['listeners_count'], 105)
+
+
+class BlogTagsTest(APITestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pass")
+        self.post = self.create_post("main", "Farming, Nigeria, fish (farming)")
+
+    def create_post(self, slug, tags, status="published", **kwargs):
+        return BlogPost.objects.create(
+            title=slug, slug=slug, content="", author=self.author, status=status, tags=tags, **kwargs
+        )
+
+    def test_tags_keep_display_casing_and_order(self):
+        self.assertEqual(self.post.tags_list, ["Farming", "Nigeria", "fish (farming)"])
+        post = BlogPost.objects.get(pk=self.post.pk)
+        post.tags = "nigeria,  Palm   Oil, NIGERIA"
+        post.save()
+        self.assertEqual(post.tags_list, ["nigeria", "Palm Oil"])
+
+    def test_tags_are_matched_case_insensitively(self):
+        self.assertEqual(list(self.post.tag_objects.values_list('name', flat=True)), ["farming", "fish (farming)", "nigeria"])
+        self.create_post("shouting", "NIGERIA", published_at=timezone.now())
+        self.assertEqual([post.slug for post in self.post.related_posts()], ["shouting"])
+
+    def test_related_posts_ranked_by_shared_tags(self):
+        now = timezone.now()
+        self.create_post("one-shared", "nigeria", published_at=now)
+        self.create_post("two-shared", "farming, nigeria", published_at=now - timedelta(days=1))
+        self.create_post("substring", "farm", published_at=now)
+        self.create_post("draft", "farming, nigeria", status="draft")
+        related = [post.slug for post in self.post.related_posts()]
+        self.assertEqual(related, ["two-shared", "one-shared"])
+
+    def test_blog_list_reads_tags_without_extra_queries(self):
+        for i in range(5):
+            self.create_post(f"post-{i}", "farming, nigeria")
+        with self.assertNumQueries(4):  # ETag validator + count + page + tags
+            response = self.client.get(reverse('blogpost-list'))
+        self.assertEqual(response.data['results'][0]['tags_list'], ["farming", "nigeria"])
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Music")
+        RadioStation.objects.bulk_create([
+            RadioStation(
+                name=f"Station {i}", stream_url="https://example.com/stream", category=category,
+                country="Nigeria", language="English", listeners_count=i % 3
+            )
+            for i in range(7)
+        ])
+        self.url = reverse('radiostation-list')
+
+    def test_page_numbers_remain_the_default(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['count'], 7)
+
+    def test_cursor_walks_every_row_once_in_key_order(self):
+        seen = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 3})
+        while True:
+            self.assertNotIn('count', response.data)
+            seen.extend((row['listeners_count'], row['id']) for row in response.data['results'])
+            if response.data['next'] is None:
+                break
+            with self.assertNumQueries(2):  # ETag validator + page; no COUNT, no OFFSET
+                response = self.client.get(response.data['next'])
+
+        self.assertEqual(seen, sorted(seen, key=lambda key: (-key[0], key[1])))
+        self.assertEqual(len(seen), 7)
+
+    def test_history_cursor_is_per_user(self):
+        user = User.objects.create_user(username="listener", password="pass")
+        station = RadioStation.objects.first()
+        for minutes in range(3):
+            ListeningHistory.objects.create(user=user, station=station, duration_minutes=minutes)
+        self.client.force_authenticate(user)
+
+        first = self.client.get(reverse('listeninghistory-list'), {'cursor': '', 'page_size': 2})
+        second = self.client.get(first.data['next'])
+        minutes = [row['duration_minutes'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(minutes, [2, 1, 0])
+        self.assertIsNone(second.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_bad_values(self):
+        def cursor(position):
+            return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+        for url, position in [
+            (self.url, ["abc", 1]),
+            (self.url, [{"a": 1}, 2]),
+            (self.url, [None, 2]),
+            (self.url, [1]),
+            ('/api/events/', ["x", 1]),
+        ]:
+            response = self.client.get(url, {'cursor': cursor(position)})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, position)
+
+
+class FragmentCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Music")
+        self.station = RadioStation.objects.create(
+            name="Lagos Jazz", stream_url="https://example.com/stream", category=self.category,
+            country="Nigeria", language="English"
+        )
+
+    def test_shared_fragments_skip_the_database(self):
+        for url in (reverse('stations'), reverse('events'), reverse('home')):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.client.get(url)
+
+    def test_fragments_are_keyed_on_filters(self):
+        self.client.get(reverse('stations'))
+        response = self.client.get(reverse('stations'), {'quality': 'ultra'})
+        self.assertContains(response, "No stations found")
+
+    def test_untracked_params_share_the_fragment(self):
+        for _ in range(2):
+            self.client.get(reverse('stations'), {'country': 'Nigeria', 'utm_source': 'newsletter'})
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('stations'), {'country': 'Nigeria', 'fbclid': 'abc'})
+        self.assertContains(response, "Lagos Jazz")
+        self.assertNotContains(response, "utm_source")
+
+    def test_signals_bump_the_content_version(self):
+        self.client.get(reverse('stations'))
+        self.station.name = "Abuja Jazz"
+        self.station.save()
+        self.assertContains(self.client.get(reverse('stations')), "Abuja Jazz")
+
+        Event.objects.create(
+            title="Morning Show", description="", station=self.station, event_type="live_show",
+            start_time=timezone.now() + timedelta(hours=1), end_time=timezone.now() + timedelta(hours=2)
+        )
+        self.assertContains(self.client.get(reverse('events')), "Morning Show")
+
+        self.category.name = "Highlife"
+        self.category.save()
+        self.assertContains(self.client.get(reverse('stations')), "Highlife")
+
+    def test_bulk_station_changes_bump_the_content_version(self):
+        self.client.get(reverse('stations'))
+        RadioStation.objects.filter(pk=self.station.pk).update(name="Renamed")
+        self.assertContains(self.client.get(reverse('stations')), "Renamed")
+
+        self.client.get(reverse('stations'))
+        RadioStation.objects.filter(pk=self.station.pk).update(listeners_count=10)
+        self.assertContains(self.client.get(reverse('stations')), "Renamed")
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        event_index.clear()
+        self.user = User.objects.create_user(username='etag', password='testpass123')
+        self.category = Category.objects.create(name="Music")
+        self.station = RadioStation.objects.create(
+            name="Lagos Jazz", stream_url="https://example.com/stream", category=self.category,
+            country="Nigeria", language="English"
+        )
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_resources_return_not_modified(self):
+        BlogPost.objects.create(
+            title="Hello", slug="hello", author=self.user, content="Body", status="published",
+            published_at=timezone.now()
+        )
+        urls = [
+            '/api/stations/', f'/api/stations/{self.station.pk}/', '/api/stations/popular/',
+            '/api/stations/featured/', '/api/blog/', '/api/blog/hello/', '/api/blog/recent/',
+            '/api/events/', '/api/events/upcoming/',
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            # At most the validator aggregate (events validate from memory)
+            with CaptureQueriesContext(connection) as queries:
+                not_modified = self.revalidate(url, response)
+            self.assertLessEqual(len(queries), 1, url)
+            self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED, url)
+            self.assertEqual(not_modified.content, b'')
+            self.assertEqual(not_modified['ETag'], response['ETag'])
+
+    def test_last_modified_for_shared_representations(self):
+        BlogPost.objects.create(
+            title="Hello", slug="hello", author=self.user, content="Body", status="published",
+            published_at=timezone.now()
+        )
+        response = self.client.get('/api/blog/')
+        not_modified = self.client.get('/api/blog/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Listener counts don't move updated_at, so stations only get an ETag
+        self.assertNotIn('Last-Modified', self.client.get('/api/stations/'))
+
+    def test_invalid_lookup_is_not_found(self):
+        self.assertEqual(self.client.get('/api/stations/abc/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_changes_produce_a_new_etag(self):
+        url = '/api/stations/'
+        response = self.client.get(url)
+        updated_at = RadioStation.objects.get(pk=self.station.pk).updated_at
+
+        counter = ListenerCounter()
+        counter.increment(self.station.pk)
+        counter.flush()
+        refreshed = self.revalidate(url, response)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertEqual(refreshed.data['results'][0]['listeners_count'], 1)
+        self.assertEqual(RadioStation.objects.get(pk=self.station.pk).updated_at, updated_at)
+
+        self.category.name = "Highlife"
+        self.category.save()
+        self.assertEqual(self.revalidate(url, refreshed).status_code, status.HTTP_200_OK)
+
+    def test_etag_varies_with_favorites(self):
+        self.client.force_authenticate(self.user)
+        url = f'/api/stations/{self.station.pk}/'
+        response = self.client.get(url)
+        self.client.post(f'/api/stations/{self.station.pk}/toggle_favorite/')
+        refreshed = self.revalidate(url, response)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertTrue(refreshed.data['is_favorited'])
+
+    def test_new_events_produce_a_new_etag(self):
+        url = '/api/events/upcoming/'
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(
+                title="Morning Show", description="", station=self.station, event_type="live_show",
+                start_time=timezone.now() + timedelta(hours=1), end_time=timezone.now() + timedelta(hours=2)
+            )
+        refreshed = self.revalidate(url, response)
+        self.assertEqual(refreshed.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(refreshed.data), 1)
+
+
+class SparseFieldsetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='sparse', password='testpass123')
+        self.category = Category.objects.create(name="Music")
+        self.station = RadioStation.objects.create(
+            name="Lagos Jazz", description="Long description", stream_url="https://example.com/stream",
+            category=self.category, country="Nigeria", language="English"
+        )
+        BlogPost.objects.create(
+            title="Hello", slug="hello", author=self.user, content="Body " * 100, excerpt="Short",
+            tags="farming", status="published", published_at=timezone.now()
+        )
+
+    def get_with_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        return response, ' '.join(query['sql'] for query in queries)
+
+    def test_lists_use_compact_serializers(self):
+        response, sql = self.get_with_queries('/api/stations/')
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertNotIn('"radio_app_radiostation"."description"', sql)
+        self.assertIn('description', self.client.get(f'/api/stations/{self.station.pk}/').data)
+
+        for url in ('/api/blog/', '/api/blog/recent/'):
+            response, sql = self.get_with_queries(url)
+            results = response.data['results'] if 'results' in response.data else response.data
+            self.assertEqual(results[0]['excerpt'], "Short")
+            self.assertNotIn('content', results[0])
+            self.assertNotIn('"radio_app_blogpost"."content"', sql)
+        self.assertIn('content', self.client.get('/api/blog/hello/').data)
+
+    def test_fields_and_exclude(self):
+        response, sql = self.get_with_queries('/api/stations/', {'fields': 'id,name,category_name'})
+        self.assertEqual(response.data['results'], [{'id': self.station.pk, 'name': "Lagos Jazz", 'category_name': "Music"}])
+        self.assertNotIn('"radio_app_radiostation"."stream_url"', sql)
+        self.assertNotIn('"radio_app_category"."description"', sql)
+
+        # ?fields= can reach fields the compact list leaves out
+        response = self.client.get('/api/stations/', {'fields': 'description'})
+        self.assertEqual(response.data['results'], [{'description': "Long description"}])
+
+        response, sql = self.get_with_queries('/api/blog/hello/', {'exclude': 'content,tags_list'})
+        self.assertNotIn('content', response.data)
+        self.assertNotIn('"radio_app_blogpost"."content"', sql)
+        self.assertNotIn('radio_app_blogposttag', sql)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get('/api/stations/', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_endpoints_accept_exclusions_of_full_fields(self):
+        for url, excluded in (
+            ('/api/stations/', 'description'),
+            ('/api/stations/featured/', 'description'),
+            ('/api/blog/', 'content'),
+            ('/api/events/', 'description'),
+        ):
+            response = self.client.get(url, {'exclude': excluded})
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+
+        response = self.client.get('/api/stations/', {'exclude': 'description,stream_url'})
+        self.assertNotIn('stream_url', response.data['results'][0])
+        self.assertIn('name', response.data['results'][0])
+        response = self.client.get('/api/stations/', {'exclude': 'password'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_empty_fields_keeps_the_compact_serializer(self):
+        response = self.client.get('/api/stations/', {'fields': ''})
+        self.assertNotIn('description', response.data['results'][0])
+        self.assertIn('is_favorited', response.data['results'][0])
+
+    def test_profile_favorites_honour_fields(self):
+        UserProfile.objects.create(user=self.user).favorite_stations.add(self.station)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/profile/favorites/')
+        self.assertNotIn('description', response.data[0])
+        self.assertTrue(response.data[0]['is_favorited'])
+
+        response, sql = self.get_with_queries('/api/profile/favorites/', {'fields': 'id,description'})
+        self.assertEqual(response.data, [{'id': self.station.pk, 'description': "Long description"}])
+        self.assertNotIn('"radio_app_radiostation"."stream_url"', sql)
+
+        response = self.client.get('/api/profile/favorites/', {'exclude': 'stream_url,logo'})
+        self.assertNotIn('stream_url', response.data[0])
+        self.assertIn('listeners_count', response.data[0])
+
+
+class JSONEncodingTest(APITestCase):
+    def test_fast_renderer_matches_drf_output(self):
+        data = {
+            'utc': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            'offset': datetime(2024, 5, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=1))),
+            'day': date(2024, 5, 1),
+            'duration': timedelta(minutes=90),
+            'price': Decimal('1.50'),
+            'label': gettext_lazy('Live Show'),
+            'id': uuid.UUID(int=1),
+            'counts': {7: 4},
+            'text': 'Bogotá \u2028 line',
+            'rows': Category.objects.none(),
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'), JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_api_uses_the_fast_path(self):
+        user = User.objects.create_user(username='encoder', password='testpass123')
+        self.client.force_authenticate(user)
+        response = self.client.post('/api/history/batch/', '{"sessions": [', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JSON parse error', response.data['detail'])
+
+        response = self.client.post('/api/history/batch/', '{"sessions": []}', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.content, b'{"accepted":0,"rejected":[]}')
+
+
 class EventModelTest(TestCase):
     def setUp(self):
         self.category = Category.objects.create(name="Test Category")
@@ -102,6 +1372,267 @@ class EventModelTest(TestCase):
         self.assertEqual(str(self.event), expected)
 
 
+class LiveEventsSnapshotTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.live_event = Event.objects.create(
+            title="Live Event",
+            description="On air",
+            station=self.station,
+            start_time=self.now - timedelta(hours=1),
+            end_time=self.now + timedelta(hours=1)
+        )
+        self.next_event = Event.objects.create(
+            title="Next Event",
+            description="Later",
+            station=self.station,
+            start_time=self.now + timedelta(minutes=30),
+            end_time=self.now + timedelta(hours=2)
+        )
+        event_index.clear()
+        self.snapshot = LiveEventsSnapshot()
+
+    def test_snapshot_is_computed_once(self):
+        with self.assertNumQueries(2):  # index load + live events
+            events = self.snapshot.get(now=self.now)
+        with self.assertNumQueries(0):
+            self.assertIs(self.snapshot.get(now=self.now + timedelta(minutes=10)), events)
+        self.assertEqual([event['id'] for event in events], [self.live_event.id])
+
+    def test_snapshot_expires_at_next_boundary(self):
+        self.snapshot.get(now=self.now)
+        events = self.snapshot.get(now=self.now + timedelta(minutes=31))
+        self.assertEqual([event['id'] for event in events], [self.live_event.id, self.next_event.id])
+
+    def test_snapshot_is_invalidated(self):
+        self.snapshot.get(now=self.now)
+        self.snapshot.invalidate()
+        with self.assertNumQueries(1):
+            self.snapshot.get(now=self.now)
+
+    def test_signals_invalidate_after_commit(self):
+        live_events_snapshot.get(now=self.now)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.live_event.title = "Renamed"
+            self.live_event.save()
+            self.assertIsNotNone(live_events_snapshot._events)
+        self.assertTrue(callbacks)
+        self.assertIsNone(live_events_snapshot._events)
+
+
+class EventBroadcastTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.channel_layer = get_channel_layer()
+        self.channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)('events', self.channel_name)
+
+    def tearDown(self):
+        async_to_sync(self.channel_layer.group_discard)('events', self.channel_name)
+
+    def receive(self):
+        return async_to_sync(self.channel_layer.receive)(self.channel_name)
+
+    def test_signals_broadcast_typed_deltas(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            event = Event.objects.create(
+                title="Live Event",
+                description="On air",
+                station=self.station,
+                start_time=now - timedelta(hours=1),
+                end_time=now + timedelta(hours=1)
+            )
+        message = self.receive()
+        self.assertEqual(message['type'], 'event_update')
+        self.assertEqual(message['action'], 'created')
+        self.assertEqual(message['event']['id'], event.id)
+        self.assertTrue(message['event']['is_live'])
+
+        event.end_time = now - timedelta(minutes=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            event.save()
+        message = self.receive()
+        self.assertEqual(message['action'], 'updated')
+        self.assertFalse(message['event']['is_live'])
+
+        event_id = event.id
+        with self.captureOnCommitCallbacks(execute=True):
+            event.delete()
+        message = self.receive()
+        self.assertEqual(message['action'], 'deleted')
+        self.assertEqual(message['event']['id'], event_id)
+
+    def test_rolled_back_changes_are_not_broadcast(self):
+        now = timezone.now()
+        with self.captureOnCommitCallbacks() as callbacks:
+            Event.objects.create(
+                title="Draft",
+                description="Never committed",
+                station=self.station,
+                start_time=now,
+                end_time=now + timedelta(hours=1)
+            )
+        self.assertEqual(len(callbacks), 4)  # index patch, snapshot invalidation, scheduling, delta
+        with self.assertRaises(asyncio.TimeoutError):
+            async_to_sync(asyncio.wait_for)(self.channel_layer.receive(self.channel_name), 0.1)
+
+
+class EventIntervalIndexTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.marathon = self.create_event("Marathon", -timedelta(days=2), timedelta(days=1))
+        self.morning = self.create_event("Morning", -timedelta(hours=1), timedelta(hours=1))
+        self.past = self.create_event("Past", -timedelta(hours=5), -timedelta(hours=4))
+        self.next = self.create_event("Next", timedelta(hours=2), timedelta(hours=3))
+        self.later = self.create_event("Later", timedelta(hours=4), timedelta(hours=5))
+        self.index = EventIntervalIndex()
+
+    def create_event(self, title, start_offset, end_offset):
+        return Event.objects.create(
+            title=title,
+            description=title,
+            station=self.station,
+            start_time=self.now + start_offset,
+            end_time=self.now + end_offset
+        )
+
+    def test_queries(self):
+        self.assertEqual(self.index.live_ids(self.now), [self.marathon.id, self.morning.id])
+        self.assertEqual(
+            [event_id for event_id, _, _ in self.index.overlapping(self.now - timedelta(hours=6), self.now - timedelta(hours=3))],
+            [self.marathon.id, self.past.id]
+        )
+        self.assertEqual(self.index.upcoming_ids(self.now, limit=1), [self.next.id])
+
+    def test_incremental_updates(self):
+        self.index.live_ids(self.now)
+        self.index.add(self.next.id, self.now - timedelta(minutes=5), self.now + timedelta(minutes=5))
+        self.index.remove(self.marathon.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.index.live_ids(self.now), [self.morning.id, self.next.id])
+            self.assertEqual(self.index.upcoming_ids(self.now), [self.later.id])
+
+    def test_long_events_do_not_widen_short_lookups(self):
+        self.index.live_ids(self.now)
+        short_bucket = self.index._buckets[_duration_bucket(timedelta(hours=2))]
+        self.assertNotIn((self.marathon.start_time, self.marathon.id), short_bucket)
+        self.assertEqual(self.index.live_ids(self.now - timedelta(hours=4, minutes=30)), [self.marathon.id, self.past.id])
+
+    def test_refresh_follows_changes_from_other_processes(self):
+        self.index.live_ids(self.now)
+        with self.assertNumQueries(0):
+            self.index.refresh()
+
+        Event.objects.filter(pk=self.next.pk).update(start_time=self.now - timedelta(minutes=5))
+        EventIntervalIndex().remove(self.past.id)  # another process publishing a change
+        with self.assertNumQueries(1):
+            self.index.refresh()
+        self.assertEqual(self.index.live_ids(self.now), [self.marathon.id, self.morning.id, self.next.id])
+
+    def test_signals_patch_the_index_on_commit(self):
+        event_index.clear()
+        event_index.live_ids(self.now)
+        with self.captureOnCommitCallbacks(execute=True):
+            event = self.create_event("Breaking", -timedelta(minutes=1), timedelta(minutes=1))
+            self.assertNotIn(event.id, event_index.live_ids(self.now))
+        with self.assertNumQueries(0):
+            self.assertIn(event.id, event_index.live_ids(self.now))
+
+
+class EventTransitionSchedulerTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.category = Category.objects.create(name="Test Category")
+        self.station = RadioStation.objects.create(
+            name="Test Station",
+            stream_url="https://example.com/stream",
+            category=self.category,
+            country="Test Country",
+            language="English"
+        )
+        self.event = Event.objects.create(
+            title="Soon",
+            description="Starts soon",
+            station=self.station,
+            start_time=self.now + timedelta(minutes=5),
+            end_time=self.now + timedelta(minutes=20)
+        )
+        Event.objects.create(
+            title="Far Away",
+            description="Outside the horizon",
+            station=self.station,
+            start_time=self.now + timedelta(days=2),
+            end_time=self.now + timedelta(days=2, hours=1)
+        )
+        event_index.clear()
+        self.scheduler = EventTransitionScheduler(horizon=timedelta(hours=1))
+        self.scheduler.reload(now=self.now)
+
+    def test_boundaries_fire_in_order(self):
+        self.assertEqual(self.scheduler.due_transitions(self.now + timedelta(minutes=1)), [])
+        self.assertEqual(
+            self.scheduler.due_transitions(self.now + timedelta(minutes=5)),
+            [(self.event.id, 'start')]
+        )
+        self.assertEqual(
+            self.scheduler.due_transitions(self.now + timedelta(hours=1)),
+            [(self.event.id, 'end')]
+        )
+
+    def test_rescheduled_and_deleted_events_skip_stale_boundaries(self):
+        self.scheduler.schedule(
+            self.event.id,
+            self.now + timedelta(minutes=10),
+            self.now + timedelta(minutes=20),
+            now=self.now
+        )
+        self.assertEqual(self.scheduler.due_transitions(self.now + timedelta(minutes=6)), [])
+        self.assertEqual(
+            self.scheduler.due_transitions(self.now + timedelta(minutes=10)),
+            [(self.event.id, 'start')]
+        )
+        self.scheduler.unschedule(self.event.id)
+        self.assertEqual(self.scheduler.due_transitions(self.now + timedelta(hours=1)), [])
+
+    def test_signals_reschedule_only_after_commit(self):
+        event_scheduler.reload(now=self.now)
+        self.event.start_time = self.now + timedelta(minutes=10)
+        with self.captureOnCommitCallbacks():
+            self.event.save()
+        # Not committed yet (as if rolled back): the old boundary still stands
+        self.assertEqual(event_scheduler.due_transitions(self.now + timedelta(minutes=5)), [(self.event.id, 'start')])
+
+        event_scheduler.reload(now=self.now)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.save()
+        self.assertEqual(event_scheduler.due_transitions(self.now + timedelta(minutes=5)), [])
+        self.assertEqual(event_scheduler.due_transitions(self.now + timedelta(minutes=10)), [(self.event.id, 'start')])
+
+
 class BlogPostModelTest(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -122,4 +1653,12 @@ class BlogPostModelTest(TestCase):
         self.assertEqual(self.post.status, 'published')
 
     def test_post_str_method(self):
-        self.assertEqual(str(self.post), "Test Post")
\ No newline at end of file
+        self.assertEqual(str(self.post), "Test Post")
+
+
+class QueryPlanTest(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', rows=500, stdout=out)
+        self.assertIn('All hot queries use indexes', out.getvalue())
+        self.assertFalse(RadioStation.objects.exists())
@@ -11,6 +11,9 @@ router.register(r'events', views.EventViewSet)
 router.register(r'blog', views.BlogPostViewSet)
 router.register(r'history', views.ListeningHistoryViewSet, basename='listeninghistory')
 router.register(r'contact', views.ContactViewSet)
+router.register(r'stats', views.StatsViewSet, basename='stats')
+router.register(r'analytics/stations', views.StationDailyStatsViewSet)
+router.register(r'analytics/categories', views.CategoryDailyStatsViewSet)
 
 urlpatterns = [
     path('api/', include(router.urls)),
@@ -1,11 +1,13 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.models import User
-from django.db.models import Q, Count, Sum
+from django.db.models import Prefetch
+from django.conf import settings
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from datetime import timedelta
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth import login, authenticate
@@ -13,24 +15,49 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
 from django.core.paginator import Paginator
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, QueryDict
 from django.views.decorators.csrf import csrf_exempt
 import json
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-
+import uuid
+
+from .autocomplete import autocomplete_index
+from .conditional import ConditionalGetMixin
+from .counters import listener_counter
+from .favorites import favorite_station_ids, toggle_favorite, update_favorites, validate_station_ids
+from .fragments import fragment_cache_context
+from .ingest import listening_session_buffer, validate_sessions
+from .presence import presence_tracker
+from .event_index import event_index
+from .fieldsets import SparseFieldsetMixin
 from .models import (
     Category, RadioStation, UserProfile, Event, 
-    BlogPost, ListeningHistory, Contact
+    BlogPost, ListeningHistory, Contact, StationDailyStats, CategoryDailyStats
 )
+from .rollups import get_listening_stats
+from .search import FullTextSearchFilter, full_text_search
+from .stats import get_platform_stats
 from .serializers import (
-    CategorySerializer, RadioStationSerializer, UserProfileSerializer,
-    EventSerializer, BlogPostSerializer, ListeningHistorySerializer,
-    ContactSerializer
+    CategorySerializer, RadioStationSerializer, RadioStationListSerializer, UserProfileSerializer,
+    EventSerializer, EventListSerializer, BlogPostSerializer, BlogPostListSerializer,
+    ListeningHistorySerializer, ContactSerializer, StationDailyStatsSerializer, CategoryDailyStatsSerializer
 )
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class FavoritesContextMixin:
+    """Load the user's favorite station IDs once per request for the serializers"""
+
+    def get_favorite_station_ids(self):
+        if not hasattr(self, '_favorite_station_ids'):
+            self._favorite_station_ids = favorite_station_ids(self.request.user)
+        return self._favorite_station_ids
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['favorite_station_ids'] = self.get_favorite_station_ids()
+        return context
+
+
+class CategoryViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -38,26 +65,45 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     ordering_fields = ['name', 'created_at']
 
 
-class RadioStationViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = RadioStation.objects.filter(is_active=True)
+class RadioStationViewSet(ConditionalGetMixin, SparseFieldsetMixin, FavoritesContextMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = RadioStation.objects.filter(is_active=True).select_related('category')
     serializer_class = RadioStationSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    list_serializer_class = RadioStationListSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ['category', 'country', 'language', 'quality']
-    search_fields = ['name', 'description', 'country', 'language']
     ordering_fields = ['name', 'listeners_count', 'created_at']
     ordering = ['-listeners_count']
+    cursor_ordering = ['-listeners_count', 'id']
+    conditional_timestamp_field = 'updated_at'
+    conditional_version_field = 'listeners_version'
+    conditional_exempt_actions = ('autocomplete',)
+
+    def get_etag_extras(self):
+        # `is_favorited` differs per user
+        if self.request.user.is_authenticated:
+            return [sorted(self.get_favorite_station_ids())]
+        return []
 
     @action(detail=False, methods=['get'])
     def popular(self, request):
         """Get most popular stations"""
-        popular_stations = self.queryset.order_by('-listeners_count')[:10]
+        popular_stations = self.get_queryset().order_by('-listeners_count')[:10]
         serializer = self.get_serializer(popular_stations, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Typeahead suggestions from the in-memory prefix index: ?q=<prefix>&limit=<n>"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 25)
+        except ValueError:
+            limit = 10
+        return Response(autocomplete_index.suggest(request.query_params.get('q', ''), limit))
+
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured stations (top 5 by listeners)"""
-        featured_stations = self.queryset.order_by('-listeners_count')[:5]
+        featured_stations = self.get_queryset().order_by('-listeners_count')[:5]
         serializer = self.get_serializer(featured_stations, many=True)
         return Response(serializer.data)
 
@@ -67,99 +113,131 @@ class RadioStationViewSet(viewsets.ReadOnlyModelViewSet):
         station = self.get_object()
         user_profile, created = UserProfile.objects.get_or_create(user=request.user)
         
-        if station in user_profile.favorite_stations.all():
-            user_profile.favorite_stations.remove(station)
-            is_favorited = False
-            message = "Station removed from favorites"
-        else:
-            user_profile.favorite_stations.add(station)
-            is_favorited = True
-            message = "Station added to favorites"
+        is_favorited = toggle_favorite(user_profile, station.pk)
+        message = "Station added to favorites" if is_favorited else "Station removed from favorites"
         
         return Response({
             'is_favorited': is_favorited,
             'message': message
         })
 
+    def get_stored_listeners_count(self, pk):
+        """Read only the stored counter column instead of loading the whole row"""
+        try:
+            station_id = int(pk)
+        except (TypeError, ValueError):
+            raise Http404
+        stored = self.get_queryset().filter(pk=station_id).values_list('listeners_count', flat=True).first()
+        if stored is None:
+            raise Http404
+        return station_id, stored
+
+    def get_listener_presence_key(self, create=True):
+        """Presence entry for an HTTP listener, remembered in its session"""
+        session = self.request.session
+        listener_id = session.setdefault('listener_id', uuid.uuid4().hex) if create else session.get('listener_id')
+        return f'http:{listener_id}' if listener_id else None
+
     @action(detail=True, methods=['post'])
     def increment_listeners(self, request, pk=None):
-        """Increment listener count when someone starts listening"""
-        station = self.get_object()
-        station.listeners_count += 1
-        station.save()
-        
-        # Send real-time update via WebSocket
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            'stations',
-            {
-                'type': 'listener_update',
-                'station_id': station.id,
-                'listeners_count': station.listeners_count
-            }
-        )
-        
-        return Response({'listeners_count': station.listeners_count})
+        """Count the caller as listening; call again within LISTENER_PRESENCE_TTL to stay counted"""
+        station_id, _ = self.get_stored_listeners_count(pk)
+        # Tracked like a WebSocket presence so the periodic reconcile keeps it
+        presence_tracker.join(self.get_listener_presence_key(), station_id)
+        _, stored = self.get_stored_listeners_count(pk)
+        return Response({'listeners_count': listener_counter.current(station_id, stored)})
 
     @action(detail=True, methods=['post'])
     def decrement_listeners(self, request, pk=None):
-        """Decrement listener count when someone stops listening"""
-        station = self.get_object()
-        if station.listeners_count > 0:
-            station.listeners_count -= 1
-            station.save()
-            
-        # Send real-time update via WebSocket
-        channel_layer = get_channel_layer()
-        async_to_sync(channel_layer.group_send)(
-            'stations',
-            {
-                'type': 'listener_update',
-                'station_id': station.id,
-                'listeners_count': station.listeners_count
-            }
-        )
-        
-        return Response({'listeners_count': station.listeners_count})
+        """Stop counting the caller as listening to this station"""
+        station_id, _ = self.get_stored_listeners_count(pk)
+        key = self.get_listener_presence_key(create=False)
+        if key is not None and presence_tracker.station(key) == station_id:
+            presence_tracker.leave(key)
+        _, stored = self.get_stored_listeners_count(pk)
+        return Response({'listeners_count': listener_counter.current(station_id, stored)})
 
 
-class UserProfileViewSet(viewsets.ModelViewSet):
+class UserProfileViewSet(SparseFieldsetMixin, FavoritesContextMixin, viewsets.ModelViewSet):
     serializer_class = UserProfileSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return UserProfile.objects.filter(user=self.request.user)
+        if self.action == 'favorites':
+            return self.select_emitted_columns(RadioStation.objects.filter(
+                favorited_by__user=self.request.user,
+                is_active=True
+            ).select_related('category'))
+        return UserProfile.objects.filter(user=self.request.user).select_related('user').prefetch_related(
+            Prefetch('favorite_stations', queryset=RadioStation.objects.select_related('category'))
+        )
 
     @action(detail=False, methods=['get'])
     def me(self, request):
         """Get current user's profile"""
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
+        profile = self.get_queryset().first() or UserProfile.objects.create(user=request.user)
         serializer = self.get_serializer(profile)
         return Response(serializer.data)
 
-    @action(detail=False, methods=['get'])
+    @action(
+        detail=False, methods=['get'],
+        serializer_class=RadioStationSerializer, list_serializer_class=RadioStationListSerializer
+    )
     def favorites(self, request):
         """Get user's favorite stations"""
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
-        stations = profile.favorite_stations.filter(is_active=True)
-        serializer = RadioStationSerializer(stations, many=True, context={'request': request})
+        serializer = self.get_serializer(self.get_queryset(), many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='favorites/bulk')
+    def bulk_favorites(self, request):
+        """Change many favorites at once: {"add": [ids], "remove": [ids]} or {"replace": [ids]}"""
+        data = request.data if isinstance(request.data, dict) else {}
+        lists = {key: data[key] for key in ('add', 'remove', 'replace') if key in data}
+        if not lists or not all(isinstance(value, list) for value in lists.values()):
+            return Response({'error': 'Expected "add"/"remove" or "replace" lists'}, status=status.HTTP_400_BAD_REQUEST)
+        if 'replace' in lists and len(lists) > 1:
+            return Response({'error': '"replace" cannot be combined with "add" or "remove"'}, status=status.HTTP_400_BAD_REQUEST)
+        if sum(len(value) for value in lists.values()) > settings.FAVORITES_MAX_BATCH:
+            return Response(
+                {'error': f'At most {settings.FAVORITES_MAX_BATCH} station IDs per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        station_ids, rejected = {}, {}
+        for key, values in lists.items():
+            station_ids[key], rejected[key] = validate_station_ids(values)
+        user_profile, created = UserProfile.objects.get_or_create(user=request.user)
+        update_favorites(user_profile, **station_ids)
+        return Response({
+            'favorite_station_ids': sorted(favorite_station_ids(request.user)),
+            'rejected': {key: indexes for key, indexes in rejected.items() if indexes},
+        })
+
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Event.objects.all()
+class EventViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = Event.objects.select_related('station')
     serializer_class = EventSerializer
+    list_serializer_class = EventListSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['station', 'event_type', 'is_featured']
     search_fields = ['title', 'description', 'host']
     ordering_fields = ['start_time', 'created_at']
     ordering = ['start_time']
+    cursor_ordering = ['start_time', 'id']
+
+    def get_etag_extras(self):
+        # Events have no updated_at: edits bump the content version, and
+        # `is_live` / `is_upcoming` flip whenever the set of live events does
+        return [sorted(event_index.live_ids(timezone.now()))]
 
     @action(detail=False, methods=['get'])
     def upcoming(self, request):
         """Get upcoming events"""
         now = timezone.now()
-        upcoming_events = self.queryset.filter(start_time__gt=now)[:10]
+        upcoming_events = self.get_queryset().filter(
+            pk__in=event_index.upcoming_ids(now, limit=10),
+            start_time__gt=now
+        )
         serializer = self.get_serializer(upcoming_events, many=True)
         return Response(serializer.data)
 
@@ -167,7 +245,8 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
     def live(self, request):
         """Get currently live events"""
         now = timezone.now()
-        live_events = self.queryset.filter(
+        live_events = self.get_queryset().filter(
+            pk__in=event_index.live_ids(now),
             start_time__lte=now,
             end_time__gte=now
         )
@@ -177,64 +256,103 @@ class EventViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured events"""
-        featured_events = self.queryset.filter(is_featured=True)[:5]
+        featured_events = self.get_queryset().filter(is_featured=True)[:5]
         serializer = self.get_serializer(featured_events, many=True)
         return Response(serializer.data)
 
 
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = BlogPost.objects.filter(status='published')
+class BlogPostViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = BlogPost.objects.filter(status='published').select_related('author').prefetch_related('tag_links')
     serializer_class = BlogPostSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'content', 'excerpt', 'tags']
+    list_serializer_class = BlogPostListSerializer
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     ordering_fields = ['created_at', 'published_at']
     ordering = ['-published_at']
     lookup_field = 'slug'
+    conditional_timestamp_field = 'updated_at'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if 'tags_list' not in self.get_serializer().fields:
+            return queryset.prefetch_related(None)
+        return queryset
 
     @action(detail=False, methods=['get'])
     def featured(self, request):
         """Get featured blog posts"""
-        featured_posts = self.queryset.filter(is_featured=True)[:5]
+        featured_posts = self.get_queryset().filter(is_featured=True)[:5]
         serializer = self.get_serializer(featured_posts, many=True)
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Get recent blog posts"""
-        recent_posts = self.queryset.order_by('-published_at')[:10]
+        recent_posts = self.get_queryset().order_by('-published_at')[:10]
         serializer = self.get_serializer(recent_posts, many=True)
         return Response(serializer.data)
 
 
-class ListeningHistoryViewSet(viewsets.ModelViewSet):
+class ListeningHistoryViewSet(SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ListeningHistorySerializer
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ['-started_at', 'id']
 
     def get_queryset(self):
-        return ListeningHistory.objects.filter(user=self.request.user)
+        return self.select_emitted_columns(ListeningHistory.objects.filter(user=self.request.user).select_related('station'))
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Queue many listening sessions at once: {"sessions": [{"station_id", "duration_minutes"}, ...]}"""
+        sessions = request.data.get('sessions') if isinstance(request.data, dict) else None
+        if not isinstance(sessions, list):
+            return Response({'error': 'Expected a "sessions" list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(sessions) > settings.LISTENING_SESSION_MAX_BATCH:
+            return Response(
+                {'error': f'At most {settings.LISTENING_SESSION_MAX_BATCH} sessions per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows, rejected = validate_sessions(request.user, sessions)
+        if not listening_session_buffer.add(rows):
+            return Response(
+                {'error': 'Too many sessions queued, retry later'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'}
+            )
+        return Response({'accepted': len(rows), 'rejected': rejected}, status=status.HTTP_202_ACCEPTED)
+
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get listening statistics for the user"""
-        history = self.get_queryset()
-        total_sessions = history.count()
-        total_minutes = sum(h.duration_minutes for h in history)
-        
-        # Most listened stations
-        most_listened = history.values('station__name').annotate(
-            count=Count('station'),
-            total_minutes=models.Sum('duration_minutes')
-        ).order_by('-total_minutes')[:5]
-        
-        return Response({
-            'total_sessions': total_sessions,
-            'total_minutes': total_minutes,
-            'total_hours': round(total_minutes / 60, 1),
-            'most_listened_stations': most_listened
-        })
+        return Response(get_listening_stats(request.user))
+
+
+class StatsViewSet(viewsets.ViewSet):
+    def list(self, request):
+        """Get cached platform statistics"""
+        return Response(get_platform_stats())
+
+
+class StationDailyStatsViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Materialized listening totals per station per day (staff only)"""
+    queryset = StationDailyStats.objects.select_related('station')
+    serializer_class = StationDailyStatsSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'date': ['exact', 'gte', 'lte'], 'station': ['exact']}
+    ordering_fields = ['date', 'sessions', 'minutes', 'unique_listeners']
+
+
+class CategoryDailyStatsViewSet(SparseFieldsetMixin, viewsets.ReadOnlyModelViewSet):
+    """Materialized listening totals per category per day (staff only)"""
+    queryset = CategoryDailyStats.objects.select_related('category')
+    serializer_class = CategoryDailyStatsSerializer
+    permission_classes = [IsAdminUser]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'date': ['exact', 'gte', 'lte'], 'category': ['exact']}
+    ordering_fields = ['date', 'sessions', 'minutes', 'unique_listeners']
 
 
 class ContactViewSet(viewsets.ModelViewSet):
@@ -256,61 +374,46 @@ class ContactViewSet(viewsets.ModelViewSet):
 # Template Views
 def home(request):
     """Home page with featured content"""
+    # Querysets stay lazy so cached fragments skip them entirely
     # Get featured stations (top 5 by listeners)
-    featured_stations = RadioStation.objects.filter(is_active=True).order_by('-listeners_count')[:5]
-    
-    # Add is_favorited field for authenticated users
-    if request.user.is_authenticated:
-        user_profile, created = UserProfile.objects.get_or_create(user=request.user)
-        favorite_ids = user_profile.favorite_stations.values_list('id', flat=True)
-        for station in featured_stations:
-            station.is_favorited = station.id in favorite_ids
-    else:
-        for station in featured_stations:
-            station.is_favorited = False
+    featured_stations = RadioStation.objects.filter(is_active=True).select_related('category').order_by('-listeners_count')[:5]
     
     # Get live events
     now = timezone.now()
     live_events = Event.objects.filter(
+        pk__in=event_index.live_ids(now),
         start_time__lte=now,
         end_time__gte=now
-    )[:5]
+    ).select_related('station')[:5]
     
     # Get recent blog posts
-    recent_posts = BlogPost.objects.filter(status='published').order_by('-published_at')[:3]
-    
-    # Get platform statistics
-    stats = {
-        'total_stations': RadioStation.objects.filter(is_active=True).count(),
-        'total_listeners': sum(station.listeners_count for station in RadioStation.objects.filter(is_active=True)),
-        'live_events': live_events.count(),
-        'countries_count': RadioStation.objects.filter(is_active=True).values('country').distinct().count(),
-    }
+    recent_posts = BlogPost.objects.filter(status='published').select_related('author').order_by('-published_at')[:3]
     
     context = {
         'featured_stations': featured_stations,
         'live_events': live_events,
         'recent_posts': recent_posts,
-        'stats': stats,
+        'stats': get_platform_stats(),
+        **fragment_cache_context(request),
     }
     return render(request, 'home.html', context)
 
 
+# Query parameters that change the stations listing; anything else (tracking
+# tags, cache busters) is left out of the fragment key and the cached links
+STATION_LISTING_PARAMS = ('search', 'category', 'country', 'language', 'quality', 'page')
+
+
 def stations_view(request):
     """Stations listing with search and filters"""
     stations = RadioStation.objects.filter(is_active=True)
     categories = Category.objects.all()
     countries = RadioStation.objects.filter(is_active=True).values_list('country', flat=True).distinct().order_by('country')
     
-    # Search
+    # Search (ranked full-text)
     search = request.GET.get('search')
     if search:
-        stations = stations.filter(
-            Q(name__icontains=search) |
-            Q(description__icontains=search) |
-            Q(country__icontains=search) |
-            Q(language__icontains=search)
-        )
+        stations = full_text_search(stations, search)
     
     # Filters
     category = request.GET.get('category')
@@ -327,29 +430,27 @@ def stations_view(request):
     if quality:
         stations = stations.filter(quality=quality)
     
-    # Order by listeners count
-    stations = stations.order_by('-listeners_count')
-    
-    # Add is_favorited field for authenticated users
-    if request.user.is_authenticated:
-        user_profile, created = UserProfile.objects.get_or_create(user=request.user)
-        favorite_ids = user_profile.favorite_stations.values_list('id', flat=True)
-        for station in stations:
-            station.is_favorited = station.id in favorite_ids
-    else:
-        for station in stations:
-            station.is_favorited = False
+    # Order by relevance (when searching), then listeners count
+    stations = stations.select_related('category')
+    stations = stations.order_by('-search_rank', '-listeners_count') if search else stations.order_by('-listeners_count')
     
-    # Pagination
+    # Pagination (only the requested page is fetched, and only on a fragment cache miss)
     paginator = Paginator(stations, 20)
     page_number = request.GET.get('page')
-    stations = paginator.get_page(page_number)
+    stations = SimpleLazyObject(lambda: paginator.get_page(page_number))
+    
+    listing_params = QueryDict(mutable=True)
+    for name in STATION_LISTING_PARAMS:
+        if request.GET.get(name):
+            listing_params[name] = request.GET[name]
     
     context = {
         'stations': stations,
         'categories': categories,
         'countries': countries,
         'selected_category': selected_category,
+        'listing_params': listing_params,
+        **fragment_cache_context(request, sorted(listing_params.items())),
     }
     return render(request, 'stations.html', context)
 
@@ -360,43 +461,40 @@ def events_view(request):
     
     # Live events
     live_events = Event.objects.filter(
+        pk__in=event_index.live_ids(now),
         start_time__lte=now,
         end_time__gte=now
-    ).order_by('start_time')
+    ).select_related('station').order_by('start_time')
     
     # Upcoming events
     upcoming_events = Event.objects.filter(
         start_time__gt=now
-    ).order_by('start_time')
+    ).select_related('station').order_by('start_time')
     
-    # Pagination for upcoming events
+    # Pagination for upcoming events (only evaluated on a fragment cache miss)
     paginator = Paginator(upcoming_events, 20)
     page_number = request.GET.get('page')
-    upcoming_events = paginator.get_page(page_number)
+    upcoming_events = SimpleLazyObject(lambda: paginator.get_page(page_number))
     
     context = {
         'live_events': live_events,
         'upcoming_events': upcoming_events,
+        **fragment_cache_context(request, page_number),
     }
     return render(request, 'events.html', context)
 
 
 def blog_view(request):
     """Blog listing with search"""
-    posts = BlogPost.objects.filter(status='published')
+    posts = BlogPost.objects.filter(status='published').prefetch_related('tag_links')
     featured_posts = posts.filter(is_featured=True)[:3] if not request.GET.get('search') else []
     
-    # Search
+    # Search (ranked full-text)
     search = request.GET.get('search')
     if search:
-        posts = posts.filter(
-            Q(title__icontains=search) |
-            Q(content__icontains=search) |
-            Q(excerpt__icontains=search) |
-            Q(tags__icontains=search)
-        )
-    
-    posts = posts.order_by('-published_at')
+        posts = full_text_search(posts, search).order_by('-search_rank', '-published_at')
+    else:
+        posts = posts.order_by('-published_at')
     
     # Pagination
     paginator = Paginator(posts, 10)
@@ -412,16 +510,10 @@ def blog_view(request):
 
 def blog_detail(request, slug):
     """Blog post detail"""
-    post = get_object_or_404(BlogPost, slug=slug, status='published')
+    post = get_object_or_404(BlogPost.objects.prefetch_related('tag_links'), slug=slug, status='published')
     
-    # Get related posts (same tags)
-    related_posts = []
-    if post.tags:
-        tags = [tag.strip() for tag in post.tags.split(',')]
-        related_posts = BlogPost.objects.filter(
-            status='published',
-            tags__iregex=r'(' + '|'.join(tags) + ')'
-        ).exclude(id=post.id)[:3]
+    # Related posts, ranked by the number of shared tags
+    related_posts = post.related_posts().prefetch_related('tag_links')
     
     context = {
         'post': post,
@@ -441,21 +533,8 @@ def dashboard(request):
     # Get listening history
     listening_history = ListeningHistory.objects.filter(user=request.user).order_by('-started_at')[:10]
     
-    # Get listening statistics
-    total_sessions = ListeningHistory.objects.filter(user=request.user).count()
-    total_minutes = sum(h.duration_minutes for h in ListeningHistory.objects.filter(user=request.user))
-    
-    most_listened = ListeningHistory.objects.filter(user=request.user).values('station__name').annotate(
-        count=Count('station'),
-        total_minutes=Sum('duration_minutes')
-    ).order_by('-total_minutes')[:5]
-    
-    listening_stats = {
-        'total_sessions': total_sessions,
-        'total_minutes': total_minutes,
-        'total_hours': round(total_minutes / 60, 1) if total_minutes else 0,
-        'most_listened_stations': most_listened,
-    }
+    # Listening statistics come from the pre-aggregated rollups
+    listening_stats = get_listening_stats(request.user)
     
     context = {
         'profile': user_profile,
@@ -472,20 +551,7 @@ def listening_history_view(request):
     history = ListeningHistory.objects.filter(user=request.user).order_by('-started_at')
     
     # Statistics
-    total_sessions = history.count()
-    total_minutes = sum(h.duration_minutes for h in history)
-    
-    most_listened = history.values('station__name').annotate(
-        count=Count('station'),
-        total_minutes=Sum('duration_minutes')
-    ).order_by('-total_minutes')[:10]
-    
-    stats = {
-        'total_sessions': total_sessions,
-        'total_minutes': total_minutes,
-        'total_hours': round(total_minutes / 60, 1) if total_minutes else 0,
-        'most_listened_stations': most_listened,
-    }
+    stats = get_listening_stats(request.user, limit=10)
     
     # Pagination
     paginator = Paginator(history, 50)
@@ -556,16 +622,13 @@ def record_listening_session(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            station_id = data.get('station_id')
-            duration_minutes = data.get('duration_minutes', 0)
             
-            if station_id:
-                station = get_object_or_404(RadioStation, id=station_id)
-                ListeningHistory.objects.create(
-                    user=request.user,
-                    station=station,
-                    duration_minutes=duration_minutes
-                )
+            if data.get('station_id'):
+                rows, rejected = validate_sessions(request.user, [data])
+                if rejected:
+                    raise Http404("Station not found")
+                if not listening_session_buffer.add(rows):
+                    return JsonResponse({'status': 'error', 'message': 'Too many sessions queued, retry later'}, status=503)
                 return JsonResponse({'status': 'success'})
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': str(e)})
@@ -1,16 +1,30 @@
 import os
 from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'radio_project.settings')
+
+# Set up Django before importing consumers, which import models
+django_asgi_app = get_asgi_application()
+
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 import radio_app.routing
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'radio_project.settings')
+from radio_app.event_index import event_index
+from radio_app.presence import presence_tracker
+from radio_app.scheduler import event_scheduler
 
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
+    "http": django_asgi_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             radio_app.routing.websocket_urlpatterns
         )
     ),
-})
\ No newline at end of file
+})
+
+# Load the event index off the request path and follow other processes' changes
+event_index.start()
+# Push live-event start/end transitions to WebSocket clients as they happen
+event_scheduler.start()
+# Reset listener counts left inflated by presence lost in the last restart
+presence_tracker.start()
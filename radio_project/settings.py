@@ -107,8 +107,19 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    # Page numbers by default; ?cursor= switches views with a cursor_ordering to keyset pagination
+    'DEFAULT_PAGINATION_CLASS': 'radio_app.pagination.OptInCursorPagination',
+    'PAGE_SIZE': 20,
+    # orjson-backed JSON (falls back to the standard library if orjson isn't installed)
+    'DEFAULT_RENDERER_CLASSES': [
+        'radio_app.encoding.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'radio_app.encoding.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
 # CORS settings
@@ -142,6 +153,72 @@ else:
         }
     }
 
+# Cache configuration
+# Use Redis in production so cached snapshots are shared between processes
+if config('REDIS_URL', default=None):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds the home page / API platform statistics stay cached
+PLATFORM_STATS_CACHE_TTL = config('PLATFORM_STATS_CACHE_TTL', default=30, cast=int)
+
+# Seconds cached template fragments (home, stations, events) live; they are
+# also invalidated whenever stations, events, categories or posts change.
+FRAGMENT_CACHE_TTL = config('FRAGMENT_CACHE_TTL', default=60, cast=int)
+
+# Listener counters
+# Seconds between batched flushes of listener count deltas to the database.
+# Set to 0 to write every change through immediately.
+LISTENER_COUNTER_FLUSH_INTERVAL = config('LISTENER_COUNTER_FLUSH_INTERVAL', default=5, cast=float)
+# Seconds between coalesced listener_update broadcasts to WebSocket clients.
+# Set to 0 to broadcast every change immediately.
+LISTENER_BROADCAST_INTERVAL = config('LISTENER_BROADCAST_INTERVAL', default=0.5, cast=float)
+# Seconds without a heartbeat after which a WebSocket listener stops counting.
+LISTENER_PRESENCE_TTL = config('LISTENER_PRESENCE_TTL', default=90, cast=float)
+# Seconds between resets of listeners_count to the live presence counts of all
+# workers (also run at startup). Set to 0 to rely on +1/-1 deltas alone.
+LISTENER_PRESENCE_RECONCILE_INTERVAL = config('LISTENER_PRESENCE_RECONCILE_INTERVAL', default=60, cast=float)
+
+# Seconds between full rebuilds of the in-memory event interval index
+# (signals keep it current in between).
+EVENT_INDEX_TTL = config('EVENT_INDEX_TTL', default=300, cast=int)
+# Seconds between background checks for event changes made by other processes,
+# which trigger an index rebuild. Set to 0 to rebuild on lookup after the TTL.
+EVENT_INDEX_REFRESH_INTERVAL = config('EVENT_INDEX_REFRESH_INTERVAL', default=5, cast=float)
+
+# Seconds between full rebuilds of the in-memory station autocomplete index
+# (signals keep it current in between; rebuilds also refresh listener counts).
+STATION_AUTOCOMPLETE_TTL = config('STATION_AUTOCOMPLETE_TTL', default=300, cast=int)
+
+# Listening session ingestion
+# Buffered sessions are written with one bulk INSERT when this many are queued...
+LISTENING_SESSION_BATCH_SIZE = config('LISTENING_SESSION_BATCH_SIZE', default=500, cast=int)
+# ...or after this many seconds. Set to 0 to write every batch through immediately.
+LISTENING_SESSION_FLUSH_INTERVAL = config('LISTENING_SESSION_FLUSH_INTERVAL', default=2, cast=float)
+# Largest number of sessions accepted in one request
+LISTENING_SESSION_MAX_BATCH = config('LISTENING_SESSION_MAX_BATCH', default=1000, cast=int)
+# Failed flushes a batch is retried for before it is split and the rows that still fail are dropped
+LISTENING_SESSION_MAX_RETRIES = config('LISTENING_SESSION_MAX_RETRIES', default=3, cast=int)
+# Most sessions held in memory; further sessions are refused (503) until a flush succeeds
+LISTENING_SESSION_MAX_BUFFER = config('LISTENING_SESSION_MAX_BUFFER', default=50000, cast=int)
+# Seconds the set of valid station IDs stays cached (station signals also invalidate it)
+STATION_IDS_CACHE_TTL = config('STATION_IDS_CACHE_TTL', default=60, cast=int)
+# Seconds between a ListeningHistory insert and its commit that the daily stats
+# job still picks up (it re-checks days with rows inserted this long before its last run)
+DAILY_STATS_RESCAN_LAG = config('DAILY_STATS_RESCAN_LAG', default=300, cast=int)
+# Largest number of station IDs accepted by one bulk favorites request
+FAVORITES_MAX_BATCH = config('FAVORITES_MAX_BATCH', default=1000, cast=int)
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True